@@ -0,0 +1,124 @@
+import time
+from best_first_search import BestFirstSearch
+from robot_manager import RobotManager
+from time_step_node_class import TimeStepNode
+
+
+class AnytimeSearch(BestFirstSearch):
+    """AO* that can be stopped at a deadline with a complete plan.
+
+    Besides the AO* lower bounds every node carries an upper bound: the worst-case cost of a
+    complete policy below it. A robot_assignment node with a greedy rollout is bounded by the
+    rollout and by its children combined like determine_cost, whichever is lower, so an
+    expansion never raises a bound and the root keeps its first rollout, the greedy plan, as
+    long as nothing better is found. Rollouts are lazy: only the tips of the best partial
+    solution graph get one, every other tip is bounded by infinity. Once the search has to
+    stop, the plan follows the upper bounds and continues with the greedy rollout wherever
+    it reaches a node whose children do not beat it."""
+
+    def __init__(self, search_tree, robot_manager: RobotManager, deadline: float):
+        super().__init__(search_tree, robot_manager)
+        # time.monotonic() value at which the search stops
+        self.deadline = deadline
+        self.upper : dict[int, float] = {}
+        # Node id -> (node, greedy cost, greedy plan, greedy plan text)
+        self.rollouts : dict[int, tuple[TimeStepNode, float, list, list]] = {}
+
+    def out_of_time(self) -> bool:
+        return time.monotonic() >= self.deadline
+
+    def rollout(self, node: TimeStepNode) -> float:
+        """Worst-case cost of following the greedy combination from `node`."""
+        if node.id in self.rollouts:
+            return self.rollouts[node.id][1]
+
+        tree = self.search_tree.spawn()
+        root = tree.search(node.robot_map, dict(node.resolved_questions), strategy='greedy',
+                           start_query=node.query, visited_mask=node.visited_mask)
+        cost = tree.determine_cost(root)
+        plan, plan_text = tree.best_plan_from(root)
+        self.rollouts[node.id] = (node, cost, plan, plan_text)
+        return cost
+
+    def children_upper(self, node: TimeStepNode) -> float:
+        costs = [self.upper.get(next_node.id, float('inf')) + node.cost_offsets.get(next_node.id, 0.0)
+                 for next_node in node.next]
+        if node.type == 'robot_moving':
+            return costs[0]
+        elif node.type == 'query':
+            return max(0, *costs)
+        elif node.type == 'robot_assignment':
+            return min(costs)
+        else:
+            raise ValueError(f"Unknown node type: {node.type}")
+
+    def upper_bound(self, node: TimeStepNode) -> float:
+        own = self.rollouts[node.id][1] if node.id in self.rollouts else float('inf')
+        if self.is_tip(node):
+            return own
+
+        if len(node.next) == 0:
+            return node.get_cost()
+        return min(own, self.children_upper(node))
+
+    def update(self, node: TimeStepNode) -> bool:
+        changed = super().update(node)
+        upper = self.upper_bound(node)
+        if self.upper.get(node.id) != upper:
+            self.upper[node.id] = upper
+            changed = True
+        return changed
+
+    def roll_out_tips(self, root: TimeStepNode) -> bool:
+        """Rolls out the tips of the best partial solution graph that have no rollout yet.
+        Returns False when the deadline passed before all of them were rolled out."""
+        stack = [root]
+        seen = set()
+        while stack:
+            node = stack.pop()
+            if node.id in seen or node.id in self.solved:
+                continue
+            seen.add(node.id)
+            if self.is_tip(node):
+                if node.id not in self.rollouts:
+                    # The first rollout is the greedy plan, it is made even after the deadline
+                    if self.rollouts and self.out_of_time():
+                        return False
+                    self.rollout(node)
+                    self.update(node)
+                    self.propagate(node)
+                continue
+
+            unsolved = [next_node for next_node in node.next if next_node.id not in self.solved]
+            if node.type == 'robot_assignment' and unsolved:
+                stack.append(min(unsolved, key=lambda next_node: self.child_bound(node, next_node)))
+            else:
+                stack.extend(unsolved)
+        return True
+
+    def run(self) -> TimeStepNode:
+        root = self.robot_manager.head_time_step_node
+        self.robot_manager.time_step_queue.clear()
+        self.register(root)
+
+        while root.id not in self.solved and self.roll_out_tips(root):
+            tip = self.select_tip(root)
+            if not self.search_tree.expand_node(self.robot_manager, tip, deadline=self.deadline):
+                self.robot_manager.time_step_queue.clear()
+                break
+            self.robot_manager.time_step_queue.clear()
+            self.register(tip)
+            self.propagate(tip)
+
+        tree = self.search_tree
+        # The returned plan is the incumbent, so the plan walk follows the upper bounds
+        tree.cost_map.update(self.upper)
+        tree.unsolved = {node_id for node_id, cost in self.upper.items() if cost == float('inf')}
+        # Nodes whose children beat their rollout take their plan from the children instead
+        for node_id, (node, cost, plan, plan_text) in self.rollouts.items():
+            if not node.expanded or (node.next and self.children_upper(node) >= cost):
+                tree.subplans[node_id] = (plan, plan_text)
+        tree.search_stats['upper_bound'] = self.upper[root.id]
+        tree.search_stats['lower_bound'] = self.bound[root.id]
+        tree.search_stats['rollouts'] = len(self.rollouts)
+        return root
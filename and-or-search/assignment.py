@@ -0,0 +1,85 @@
+import heapq
+import itertools
+import numpy as np
+
+
+def min_cost_assignment(cost: np.ndarray) -> tuple[float, list[int]] | None:
+    """Hungarian algorithm with potentials for a rows x columns matrix with rows <= columns.
+    Returns the total cost and the column of every row, or None when every assignment has to
+    use an infinite entry."""
+    rows, columns = cost.shape
+    if rows == 0:
+        return 0.0, []
+    finite = np.isfinite(cost)
+    # Infinite entries become one big finite cost, an assignment that needs one is infeasible
+    big = (np.abs(cost[finite]).sum() + 1.0) * (rows + 1) if finite.any() else 1.0
+    matrix = np.where(finite, cost, big)
+
+    u = np.zeros(rows + 1)
+    v = np.zeros(columns + 1)
+    # Row matched to each column, 1-based with 0 for none, column 0 is the virtual start
+    match = np.zeros(columns + 1, dtype=np.intp)
+    way = np.zeros(columns + 1, dtype=np.intp)
+    for row in range(1, rows + 1):
+        match[0] = row
+        column = 0
+        minimum = np.full(columns + 1, np.inf)
+        used = np.zeros(columns + 1, dtype=bool)
+        while True:
+            used[column] = True
+            current = match[column]
+            reduced = matrix[current - 1] - u[current] - v[1:]
+            free = ~used[1:]
+            better = free & (reduced < minimum[1:])
+            minimum[1:][better] = reduced[better]
+            way[1:][better] = column
+            candidates = np.where(free, minimum[1:], np.inf)
+            next_column = int(np.argmin(candidates)) + 1
+            delta = candidates[next_column - 1]
+            u[match[used]] += delta
+            v[used] -= delta
+            minimum[1:][free] -= delta
+            column = next_column
+            if match[column] == 0:
+                break
+        while column:
+            previous = way[column]
+            match[column] = match[previous]
+            column = previous
+
+    assignment = [0] * rows
+    for column in range(1, columns + 1):
+        if match[column]:
+            assignment[match[column] - 1] = column - 1
+    if not all(finite[row, assignment[row]] for row in range(rows)):
+        return None
+    return float(sum(cost[row, assignment[row]] for row in range(rows))), assignment
+
+
+def k_best_assignments(cost: np.ndarray, k: int):
+    """Yields up to `k` assignments as (total cost, columns), cheapest first, with Murty's
+    algorithm: the space left after each solution is split into subproblems that fix its
+    first rows and forbid its next row's column."""
+    counter = itertools.count()
+    best = min_cost_assignment(cost)
+    if best is None:
+        return
+    heap = [(best[0], next(counter), best[1], cost)]
+    found = 0
+    while heap and found < k:
+        total, _, assignment, problem = heapq.heappop(heap)
+        yield total, assignment
+        found += 1
+
+        fixed = problem.copy()
+        for row, column in enumerate(assignment):
+            child = fixed.copy()
+            child[row, column] = np.inf
+            solution = min_cost_assignment(child)
+            if solution is not None:
+                heapq.heappush(heap, (solution[0], next(counter), solution[1], child))
+            # Later subproblems keep this row on its column
+            kept = fixed[row, column]
+            fixed[row, :] = np.inf
+            fixed[:, column] = np.inf
+            fixed[row, column] = kept
@@ -0,0 +1,164 @@
+import itertools
+
+# Orders are searched exhaustively up to this many variables and by sifting above it
+EXHAUSTIVE_ORDER_VARS = 6
+# Reordering rebuilds the BDD from its truth table, so it is skipped for larger BDDs
+MAX_ORDER_VARS = 14
+
+class CompiledBDD:
+    """Integer-indexed BDD.
+
+    Node 0 is the false terminal and node 1 the true terminal. Every other node tests
+    `variables[level[node]]` and continues at `low[node]` or `high[node]`. Children are
+    created before their parents, so a node id is always larger than its children's ids.
+    With `reduce` the usual ROBDD rules apply: a node whose children are equal is replaced by
+    the child and nodes with the same test and children are shared."""
+    FALSE = 0
+    TRUE = 1
+
+    def __init__(self, variables, reduce: bool = True):
+        self.variables : tuple[str, ...] = tuple(variables)
+        self.reduce = reduce
+        self.level : list[int] = [-1, -1]
+        self.low : list[int] = [self.FALSE, self.TRUE]
+        self.high : list[int] = [self.FALSE, self.TRUE]
+        self.names : list[str] = ['false', 'true']
+        self.root = self.FALSE
+        self._unique : dict[tuple[int, int, int], int] = {}
+
+    def make_node(self, level: int, low: int, high: int, name: str | None = None) -> int:
+        if self.reduce:
+            if low == high:
+                return low
+            existing = self._unique.get((level, low, high))
+            if existing is not None:
+                return existing
+
+        node = len(self.level)
+        self.level.append(level)
+        self.low.append(low)
+        self.high.append(high)
+        self.names.append(name if name is not None else f"n{node}")
+        self._unique[(level, low, high)] = node
+        return node
+
+    def __len__(self):
+        return len(self.level)
+
+    def is_terminal(self, node: int) -> bool:
+        return self.level[node] < 0
+
+    def var_name(self, node: int) -> str | None:
+        level = self.level[node]
+        return self.variables[level] if level >= 0 else None
+
+    def evaluate(self, assignment: dict[str, bool]) -> bool:
+        node = self.root
+        while not self.is_terminal(node):
+            node = self.high[node] if assignment[self.var_name(node)] else self.low[node]
+        return node == self.TRUE
+
+    def test_masks(self, prop_bit: dict[str, int]) -> list[int]:
+        """Bit of the prop tested at each node, 0 for the terminals."""
+        return [prop_bit[self.variables[level]] if level >= 0 else 0 for level in self.level]
+
+    def support_masks(self, prop_bit: dict[str, int]) -> list[int]:
+        """Props tested at or below each node."""
+        tests = self.test_masks(prop_bit)
+        support = [0] * len(self.level)
+        # Children come first, so one pass in id order is enough
+        for node in range(len(self.level)):
+            if self.level[node] >= 0:
+                support[node] = tests[node] | support[self.low[node]] | support[self.high[node]]
+        return support
+
+
+def _variable_order(nodes: dict, root: str) -> list[str]:
+    """Variables in the order a depth-first walk from the root first meets them."""
+    order = []
+    seen = set()
+    stack = [root]
+    while stack:
+        name = stack.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        node_data = nodes[name]
+        if 'var' not in node_data:
+            continue
+        if node_data['var'] not in order:
+            order.append(node_data['var'])
+        stack.append(node_data['high'])
+        stack.append(node_data['low'])
+    return order
+
+def _translate(nodes: dict, root: str, variables: list[str], reduce: bool) -> CompiledBDD:
+    bdd = CompiledBDD(variables, reduce)
+    level = {var: i for i, var in enumerate(variables)}
+    compiled : dict[str, int] = {}
+
+    def compile_node(name: str) -> int:
+        if name not in compiled:
+            node_data = nodes[name]
+            if 'var' not in node_data:
+                compiled[name] = CompiledBDD.TRUE if node_data['value'] else CompiledBDD.FALSE
+            else:
+                low = compile_node(node_data['low'])
+                high = compile_node(node_data['high'])
+                compiled[name] = bdd.make_node(level[node_data['var']], low, high, name)
+        return compiled[name]
+
+    bdd.root = compile_node(root)
+    return bdd
+
+def _from_truth_table(table: list[bool], variables: list[str], order: list[str]) -> CompiledBDD:
+    """Builds the reduced BDD of `table` for `order`. Bit i of a table index is the value of
+    variables[i]."""
+    bdd = CompiledBDD(order)
+    bits = [1 << variables.index(var) for var in order]
+
+    def build(level: int, assignment: int) -> int:
+        if level == len(order):
+            return CompiledBDD.TRUE if table[assignment] else CompiledBDD.FALSE
+        low = build(level + 1, assignment)
+        high = build(level + 1, assignment | bits[level])
+        return bdd.make_node(level, low, high)
+
+    bdd.root = build(0, 0)
+    return bdd
+
+def _best_order(bdd: CompiledBDD) -> CompiledBDD:
+    variables = list(bdd.variables)
+    table = []
+    for assignment in range(1 << len(variables)):
+        table.append(bdd.evaluate({var: bool(assignment >> i & 1) for i, var in enumerate(variables)}))
+
+    best = _from_truth_table(table, variables, variables)
+    if len(variables) <= EXHAUSTIVE_ORDER_VARS:
+        for order in itertools.permutations(variables):
+            candidate = _from_truth_table(table, variables, list(order))
+            if len(candidate) < len(best):
+                best = candidate
+        return best
+
+    # Sifting: move each variable to the position that gives the fewest nodes
+    order = list(variables)
+    for var in variables:
+        order.remove(var)
+        for position in range(len(order) + 1):
+            candidate = _from_truth_table(table, variables, order[:position] + [var] + order[position:])
+            if len(candidate) < len(best):
+                best = candidate
+        order = list(best.variables)
+    return best
+
+def compile_bdd(nodes: dict, root: str, reduce: bool = True, optimize_order: bool = False) -> CompiledBDD:
+    """Compiles the `nodes` dict of a BDD config into a CompiledBDD.
+
+    `optimize_order` rebuilds the BDD with the variable order that gives the fewest nodes.
+    Each query layer of the search asks for one BDD variable, so a different order changes
+    the questions the plan asks, not only the size of the table."""
+    bdd = _translate(nodes, root, _variable_order(nodes, root), reduce)
+    if optimize_order and reduce and len(bdd.variables) <= MAX_ORDER_VARS:
+        bdd = _best_order(bdd)
+    return bdd
@@ -0,0 +1,110 @@
+import argparse
+import random
+import time
+from create_plan import SearchTree
+from generate_bdd import random_bdd
+from heuristics import HEURISTICS
+from layered_planner import LayeredPlanner
+from robot_class import Robot
+
+
+def random_robots(count: int) -> dict[str, Robot]:
+    return {f"robot_{i}": Robot(f"robot_{i}", (random.randint(0, 20), random.randint(0, 20))) for i in range(1, count + 1)}
+
+
+def run(configs: int, num_vars: int, robots: int, strategies: list[str], heuristics: list[str], seed: int, layered: bool = False,
+        top_k: list[int] = (), deadlines: list[float] = ()):
+    """Searches random configs with every strategy and heuristic, and prints the expanded
+    robot_assignment nodes, the time and the number of configs whose cost differs from the
+    first heuristic's. The approximate planners are compared to the first search: the
+    LayeredPlanner with `layered`, whose expanded column counts layers, and the first
+    strategy and heuristic with every `top_k`. `deadlines` runs the anytime search of the
+    first heuristic with each of them, see check_anytime."""
+    random.seed(seed)
+    cases = [(random_bdd(num_vars), random_robots(robots)) for _ in range(configs)]
+
+    exact = None
+    print(f"{'strategy':<26}{'heuristic':<10}{'expanded':>10}{'seconds':>10}{'cost diffs':>12}")
+    for strategy in strategies:
+        reference = None
+        for heuristic in heuristics:
+            expanded = 0
+            costs = []
+            start = time.perf_counter()
+            for bdd_config, robot_map in cases:
+                tree = SearchTree(bdd_config=bdd_config, heuristic=heuristic)
+                root = tree.search(robot_map, {}, strategy=strategy)
+                expanded += tree.search_stats['expanded']
+                costs.append(tree.determine_cost(root))
+            elapsed = time.perf_counter() - start
+            if reference is None:
+                reference = costs
+            if exact is None:
+                exact = costs
+            diffs = sum(abs(cost - ref) > 1e-6 for cost, ref in zip(costs, reference))
+            print(f"{strategy:<26}{heuristic:<10}{expanded:>10}{elapsed:>10.2f}{diffs:>12}")
+
+    if layered:
+        layers = 0
+        costs = []
+        start = time.perf_counter()
+        for bdd_config, robot_map in cases:
+            planner = LayeredPlanner(bdd_config=bdd_config)
+            planner.get_best_plan(robot_map, {})
+            layers += planner.search_stats['layers']
+            costs.append(planner.search_stats['cost'])
+        elapsed = time.perf_counter() - start
+        diffs = sum(abs(cost - ref) > 1e-6 for cost, ref in zip(costs, exact))
+        print(f"{'layered':<26}{'-':<10}{layers:>10}{elapsed:>10.2f}{diffs:>12}")
+        print(f"layered cost / search cost: {sum(costs) / max(sum(exact), 1e-9):.3f}")
+
+    for k in top_k:
+        expanded = 0
+        costs = []
+        start = time.perf_counter()
+        for bdd_config, robot_map in cases:
+            tree = SearchTree(bdd_config=bdd_config, heuristic=heuristics[0], top_k=k)
+            root = tree.search(robot_map, {}, strategy=strategies[0])
+            expanded += tree.search_stats['expanded']
+            costs.append(tree.determine_cost(root))
+        elapsed = time.perf_counter() - start
+        diffs = sum(abs(cost - ref) > 1e-6 for cost, ref in zip(costs, exact))
+        print(f"{f'{strategies[0]} top {k}':<26}{heuristics[0]:<10}{expanded:>10}{elapsed:>10.2f}{diffs:>12}")
+        print(f"top {k} cost / search cost: {sum(costs) / max(sum(exact), 1e-9):.3f}")
+
+    if deadlines:
+        failures = check_anytime(cases, heuristics[0], sorted(deadlines), exact)
+        print(f"anytime deadlines {', '.join(f'{deadline:g}' for deadline in sorted(deadlines))}: {failures} failing configs")
+
+
+def check_anytime(cases: list, heuristic: str, deadlines: list[float], exact: list[float]) -> int:
+    """Counts the configs where the anytime search returns no plan although the exact cost
+    is positive, returns an upper bound below the exact cost, or returns a higher upper
+    bound with a later deadline. `deadlines` are in increasing order."""
+    failures = 0
+    for (bdd_config, robot_map), cost in zip(cases, exact):
+        previous = float('inf')
+        for deadline in deadlines:
+            tree = SearchTree(bdd_config=bdd_config, heuristic=heuristic)
+            plan, _ = tree.get_best_plan(robot_map, {}, strategy='ao_star', deadline=deadline)
+            upper = tree.search_stats['upper_bound']
+            if (not plan and cost > 1e-6) or upper < cost - 1e-6 or upper > previous + 1e-6:
+                failures += 1
+                break
+            previous = upper
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the search heuristics on random configs")
+    parser.add_argument('--configs', type=int, default=20)
+    parser.add_argument('--vars', type=int, default=4)
+    parser.add_argument('--robots', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--strategies', nargs='+', default=['ao_star', 'branch_and_bound'])
+    parser.add_argument('--heuristics', nargs='+', default=list(HEURISTICS))
+    parser.add_argument('--layered', action='store_true', help="also run the approximate LayeredPlanner")
+    parser.add_argument('--top-k', type=int, nargs='*', default=[], help="also search approximately with these top_k values")
+    parser.add_argument('--deadlines', type=float, nargs='*', default=[], help="also check the anytime search with these deadlines in seconds")
+    args = parser.parse_args()
+    run(args.configs, args.vars, args.robots, args.strategies, args.heuristics, args.seed, args.layered, args.top_k, args.deadlines)
@@ -0,0 +1,130 @@
+from robot_manager import RobotManager
+from time_step_node_class import TimeStepNode
+
+
+class BestFirstSearch:
+    """AO* over the AND-OR graph that SearchTree builds.
+
+    robot_assignment nodes are OR nodes (min over combinations), query nodes are AND nodes
+    (max over outcomes) and robot_moving nodes pass their child's value through. Unexpanded
+    robot_assignment nodes are valued with an admissible lower bound, only tips of the best
+    partial solution graph get expanded, and the search stops as soon as that graph has no
+    tips left, which makes its cost optimal."""
+
+    def __init__(self, search_tree, robot_manager: RobotManager):
+        self.search_tree = search_tree
+        self.robot_manager = robot_manager
+        self.bound : dict[int, float] = {}
+        self.solved : set[int] = set()
+        self.parents : dict[int, list[TimeStepNode]] = {}
+
+    def heuristic(self, node: TimeStepNode) -> float:
+        """Admissible estimate of the cost still to come below an unexpanded node."""
+        return self.search_tree.heuristic(node)
+
+    def is_tip(self, node: TimeStepNode) -> bool:
+        return (node.type == 'robot_assignment'
+                and not node.expanded
+                and not self.robot_manager.bdd.is_terminal(node.query)
+                and not self.robot_manager.beyond_horizon(node))
+
+    def child_bound(self, node: TimeStepNode, next_node: TimeStepNode) -> float:
+        return self.bound[next_node.id] + node.cost_offsets.get(next_node.id, 0.0)
+
+    def evaluate(self, node: TimeStepNode) -> tuple[float, bool]:
+        """Returns the node's current lower bound and whether that bound is exact."""
+        if self.is_tip(node):
+            return node.get_cost() + self.heuristic(node), False
+
+        if len(node.next) == 0:
+            return self.search_tree.leaf_cost(node), True
+
+        if node.type == 'robot_moving':
+            next_node = node.next[0]
+            return self.child_bound(node, next_node), next_node.id in self.solved
+
+        elif node.type == 'query':
+            cost = 0
+            solved = True
+            for next_node in node.next:
+                cost = max(cost, self.child_bound(node, next_node))
+                solved = solved and next_node.id in self.solved
+            return cost, solved
+
+        elif node.type == 'robot_assignment':
+            cost = min(self.child_bound(node, next_node) for next_node in node.next)
+            # Solved once an exact child reaches the minimum, the others can only be worse
+            solved = any(next_node.id in self.solved and self.child_bound(node, next_node) <= cost
+                         for next_node in node.next)
+            return cost, solved
+        else:
+            raise ValueError(f"Unknown node type: {node.type}")
+
+    def update(self, node: TimeStepNode) -> bool:
+        """Re-evaluates a node, returns True when its bound or solved state changed."""
+        cost, solved = self.evaluate(node)
+        was_solved = node.id in self.solved
+        if node.id in self.bound and self.bound[node.id] == cost and was_solved == solved:
+            return False
+
+        self.bound[node.id] = cost
+        if solved:
+            self.solved.add(node.id)
+        else:
+            self.solved.discard(node.id)
+        return True
+
+    def register(self, node: TimeStepNode):
+        """Records parents and bounds for the nodes created below `node` by its expansion."""
+        stack = [(node, False)]
+        seen = {node.id}
+        while stack:
+            current, ready = stack.pop()
+            if ready:
+                self.update(current)
+                continue
+
+            stack.append((current, True))
+            for next_node in current.next:
+                self.parents.setdefault(next_node.id, []).append(current)
+                # Nodes reached through the transposition table are already bounded
+                if next_node.id in self.bound or next_node.id in seen:
+                    continue
+                seen.add(next_node.id)
+                stack.append((next_node, False))
+
+    def propagate(self, node: TimeStepNode):
+        queue = list(self.parents.get(node.id, []))
+        while queue:
+            current = queue.pop()
+            if self.update(current):
+                queue.extend(self.parents.get(current.id, []))
+
+    def select_tip(self, root: TimeStepNode) -> TimeStepNode:
+        """Walks the best partial solution graph down to an unexpanded node."""
+        node = root
+        while not self.is_tip(node):
+            unsolved = [next_node for next_node in node.next if next_node.id not in self.solved]
+            if node.type == 'robot_assignment':
+                node = min(unsolved, key=lambda next_node: self.child_bound(node, next_node))
+            else:
+                # The child with the largest bound decides the max, expand it first
+                node = max(unsolved, key=lambda next_node: self.child_bound(node, next_node))
+        return node
+
+    def run(self) -> TimeStepNode:
+        root = self.robot_manager.head_time_step_node
+        # Nodes are expanded in best-first order, not in queue order
+        self.robot_manager.time_step_queue.clear()
+        self.register(root)
+
+        while root.id not in self.solved:
+            tip = self.select_tip(root)
+            self.search_tree.expand_node(self.robot_manager, tip)
+            self.robot_manager.time_step_queue.clear()
+            self.register(tip)
+            self.propagate(tip)
+
+        self.search_tree.cost_map.update(self.bound)
+        self.search_tree.unsolved = set(self.bound) - self.solved
+        return root
@@ -0,0 +1,113 @@
+from robot_manager import RobotManager
+from time_step_node_class import TimeStepNode
+
+
+class BranchAndBoundSearch:
+    """Depth-first AND-OR search with alpha-beta bounds.
+
+    robot_assignment nodes take the min over their combinations and query nodes the max over
+    their outcomes, exactly like determine_cost. A combination is abandoned as soon as its
+    accumulated cost reaches the best worst-case cost already guaranteed by one of its
+    siblings, and an outcome layer stops once its max can no longer matter to the min above.
+    Robot costs only grow along a branch, so the accumulated cost plus the search tree's
+    heuristic is a valid lower bound."""
+
+    def __init__(self, search_tree, robot_manager: RobotManager):
+        self.search_tree = search_tree
+        self.robot_manager = robot_manager
+        # Fail-soft results: exact values, and bounds for nodes whose search was cut short
+        self.exact : dict[int, float] = {}
+        self.lower : dict[int, float] = {}
+        self.upper : dict[int, float] = {}
+        self.pruned = 0
+
+    def child_value(self, node: TimeStepNode, next_node: TimeStepNode, alpha: float, beta: float) -> float:
+        offset = node.cost_offsets.get(next_node.id, 0.0)
+        return self.value(next_node, alpha - offset, beta - offset) + offset
+
+    def store(self, node: TimeStepNode, cost: float, alpha: float, beta: float) -> float:
+        if cost >= beta:
+            self.lower[node.id] = max(cost, self.lower.get(node.id, float('-inf')))
+        elif cost <= alpha:
+            self.upper[node.id] = min(cost, self.upper.get(node.id, float('inf')))
+        else:
+            self.exact[node.id] = cost
+        return cost
+
+    def value(self, node: TimeStepNode, alpha: float, beta: float) -> float:
+        # Shared nodes may be reached again with a different window
+        if node.id in self.exact:
+            return self.exact[node.id]
+        if self.lower.get(node.id, float('-inf')) >= beta:
+            return self.lower[node.id]
+        if self.upper.get(node.id, float('inf')) <= alpha:
+            return self.upper[node.id]
+
+        if node.base_cost >= beta:
+            self.pruned += 1
+            return self.store(node, node.base_cost, alpha, beta)
+
+        if node.type == 'robot_assignment':
+            # The heuristic never overestimates, so this is a lower bound as well
+            bound = node.base_cost + self.search_tree.heuristic(node)
+            if bound >= beta:
+                self.pruned += 1
+                return self.store(node, bound, alpha, beta)
+
+        if (node.type == 'robot_assignment' and not node.expanded
+                and not self.robot_manager.bdd.is_terminal(node.query)
+                and not self.robot_manager.beyond_horizon(node)):
+            self.search_tree.expand_node(self.robot_manager, node)
+            self.robot_manager.time_step_queue.clear()
+
+        if len(node.next) == 0:
+            return self.store(node, self.search_tree.leaf_cost(node), alpha, beta)
+
+        def ordered_cost(next_node: TimeStepNode) -> float:
+            return next_node.base_cost + node.cost_offsets.get(next_node.id, 0.0)
+
+        if node.type == 'robot_moving':
+            cost = self.child_value(node, node.next[0], alpha, beta)
+
+        elif node.type == 'query':
+            cost = 0
+            # Expensive outcomes first, they are the ones that raise the max past beta
+            children = sorted(node.next, key=ordered_cost, reverse=True)
+            for index, next_node in enumerate(children):
+                cost = max(cost, self.child_value(node, next_node, max(alpha, cost), beta))
+                if cost >= beta:
+                    self.pruned += len(children) - index - 1
+                    break
+
+        elif node.type == 'robot_assignment':
+            cost = float('inf')
+            # Cheap combinations first, they give the tightest bound for their siblings
+            children = sorted(node.next, key=ordered_cost)
+            for index, next_node in enumerate(children):
+                cost = min(cost, self.child_value(node, next_node, alpha, min(beta, cost)))
+                if cost <= alpha:
+                    self.pruned += len(children) - index - 1
+                    break
+        else:
+            raise ValueError(f"Unknown node type: {node.type}")
+
+        return self.store(node, cost, alpha, beta)
+
+    def run(self) -> TimeStepNode:
+        root = self.robot_manager.head_time_step_node
+        self.robot_manager.time_step_queue.clear()
+        self.value(root, float('-inf'), float('inf'))
+
+        reachable = set()
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node.id in reachable:
+                continue
+            reachable.add(node.id)
+            stack.extend(node.next)
+
+        self.search_tree.cost_map.update(self.exact)
+        self.search_tree.unsolved = reachable - set(self.exact)
+        self.search_tree.search_stats['pruned'] = self.pruned
+        return root
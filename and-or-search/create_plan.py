@@ -1,8 +1,19 @@
 import copy
-import json, uuid
-from robot_class import Robot, RobotMap
-from robot_manager import RobotManager, euclidean_distance, DISTANCE_TOLERANCE   
-from time_step_node_class import TimeStepNode
+import time
+from robot_class import RobotMap
+from robot_manager import RobotManager
+from time_step_node_class import TimeStepNode, Trajectory, NO_OFFSETS, NO_SEGMENTS, next_node_id
+from fleet_state import FleetState
+from bdd_compiler import CompiledBDD
+from best_first_search import BestFirstSearch
+from branch_and_bound_search import BranchAndBoundSearch
+from parallel_search import ParallelSearch
+from anytime_search import AnytimeSearch
+from policy import Policy
+from node_arena import NodeArena
+from objectives import Objective, COST, get_objective
+from plan_cache import PlanCache
+from planner_config import PlannerConfig
 import os
 
 COST_TOLERANCE = 0.001
@@ -33,191 +44,364 @@ class RobotAssignments:
         return self.__str__()
 
 class SearchTree:
-    def __init__(self):
-        self.location_to_pin : dict[str, tuple[int, int]] = {}
-        self.pin_to_location : dict[tuple[int, int], str] = {}
-        self.location_to_prop : dict[str, list[str]] = {}
-        self.prop_to_location: dict[str, str] = {}
-        self.props : set[str] = set()
-        self.starting_prop: str = ''
-        self.root_node: str = ''
-        self.next_query: dict[str, list[str]] = {}
-        self.cost_map: dict[str, float] = {}
-        self.bdd_config = self.import_bdd_config()
-        
-
-    def import_bdd_config(self):
-        with open ('generated_bdd.json', 'r') as file:
-            bdd_config = json.load(file)
-
-        self.props = set()
-        for node in bdd_config['nodes'].values():
-            if 'var' in node:
-                self.props.add(node['var'])
+    def __init__(self, reduce_bdd: bool = True, optimize_bdd_order: bool = False, bdd_config: dict | str | os.PathLike | None = None, plan_cache: PlanCache | None = None,
+                 heuristic: str = 'cover', top_k: int | None = None, config: PlannerConfig | None = None):
+        """`reduce_bdd` drops BDD tests whose answer cannot change the result before searching,
+        `optimize_bdd_order` also reorders the variables for the smallest BDD. `bdd_config` is
+        the config itself or the path of its JSON file, generated_bdd.json in the working
+        directory by default. With a `plan_cache` get_best_plan returns stored plans of
+        earlier searches. `heuristic` names the lower bound of the pruning strategies, see
+        heuristics.HEURISTICS.
+
+        With `top_k` the search is approximate: robot_assignment nodes only get the `top_k`
+        combinations of RobotManager.matched_combinations instead of every combination.
+
+        A tree holds the state of one search at a time. Concurrent searches each use their
+        own tree, and pass an already parsed `config` to share it, in which case its BDD and
+        heuristic options replace the ones given here."""
+        if top_k is not None and top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        self.reduce_bdd = reduce_bdd
+        self.optimize_bdd_order = optimize_bdd_order
+        self.heuristic_name = heuristic
+        self.top_k = top_k
+        self.plan_cache = plan_cache
+        self.cost_map: dict[int, float] = {}
+        # Values for objectives other than the cost, see value_map
+        self.objective_maps: dict[str, dict[int, float]] = {}
+        self.unsolved: set[int] = set()
+        self.search_stats: dict[str, float] = {}
+        # Best plan below each node searched by a worker process, see ParallelSearch
+        self.subplans: dict[int, tuple[list, list]] = {}
+        if config is None:
+            self.bdd_config = self.import_bdd_config(bdd_config)
+        else:
+            self.use_config(config)
         
-        for prop in self.props:
-            self.prop_to_location[prop] = []
 
-        
-        for loc, pin in bdd_config['locations'].items():
-            tuple_pin = tuple(pin)
-            self.location_to_pin[loc] = tuple_pin
-            self.location_to_prop[loc] = []
-            self.pin_to_location[tuple_pin] = loc
-
-        self.prop_to_location = bdd_config['prop_to_location']
-        for prop, locs in bdd_config['prop_to_location'].items():
-            for loc in locs:
-                if loc not in self.location_to_prop:
-                    self.location_to_prop[loc] = []
-                self.location_to_prop[loc].append(prop)
-
-        self.root_node = bdd_config['root']
-        self.starting_prop = bdd_config['nodes'][self.root_node]['var']
-        self.next_query = bdd_config['nodes'] 
-
-        return bdd_config
+    def import_bdd_config(self, bdd_config: dict | str | os.PathLike | None = None):
+        config = PlannerConfig.load(bdd_config, reduce_bdd=self.reduce_bdd, optimize_bdd_order=self.optimize_bdd_order, heuristic=self.heuristic_name)
+        self.use_config(config)
+        return config.bdd_config
+
+    def use_config(self, config: PlannerConfig):
+        """Binds the shared config. The location table is forked, and the heuristic with it,
+        so the distance cache and its statistics in search_stats only see this tree's searches."""
+        self.config = config
+        self.bdd_config = config.bdd_config
+        self.reduce_bdd = config.reduce_bdd
+        self.optimize_bdd_order = config.optimize_bdd_order
+        self.heuristic_name = config.heuristic_name
+        self.location_to_pin : dict[str, tuple[int, int]] = config.location_to_pin
+        self.pin_to_location : dict[tuple[int, int], str] = config.pin_to_location
+        self.location_to_prop : dict[str, list[str]] = config.location_to_prop
+        self.prop_to_location : dict[str, list[str]] = config.prop_to_location
+        self.props : set[str] = config.props
+        self.root_node : str = config.root_node
+        self.next_query : dict[str, dict] = config.next_query
+        self.locations = config.locations.fork()
+        self.encoding = config.encoding
+        self.bdd : CompiledBDD = config.bdd
+        self.starting_prop : str = config.starting_prop
+        self.heuristic = config.heuristic.fork(self.locations)
     
     def known_properties(self, visited_locations : set[str]) -> set[str]:
         """Returns the set of properties that are known to be true in the visited locations."""
-        known_props = set()
-        for loc in visited_locations:
-            for prop in self.location_to_prop[loc]:
-                if prop not in known_props:
-                    known_props.add(prop)
-        return known_props
-
-    def check_robot_destinations(self, robot_map: dict[str, Robot]):
-        visited_locations = set()
-
-        for robot in robot_map.values():
-            if robot.assigned_loc == '':
-                continue
-            target_location = self.location_to_pin[robot.assigned_loc]
-            if euclidean_distance(robot.position, target_location) < DISTANCE_TOLERANCE:
-                visited_locations.add(robot.assigned_loc)
-        
-        return visited_locations
-
-    def process_robot_movement(self, robot_manager: RobotManager, robot_map: RobotMap, current_node: TimeStepNode):
-        while robot_manager.count_traveling_robots(robot_map=robot_map) > 0:
-            arrived_robots = robot_manager.update_robot_positions(robot_map=robot_map)
-            
- 
-            robot_moving_node = TimeStepNode(
-                robot_map=robot_map,
-                id = str(uuid.uuid1()),
-                query = current_node.query,
-                type = 'robot_moving',
-                resolved_questions = current_node.resolved_questions,
-                next = [],
-            )
-            robot_moving_node.visited_locations = copy.deepcopy(current_node.visited_locations)
-            current_node.next.append(robot_moving_node)
-            current_node = robot_moving_node
+        known_mask = self.encoding.known_props(self.encoding.location_mask(visited_locations))
+        return {prop for prop, bit in self.encoding.prop_bit.items() if known_mask & bit}
 
-            
+    def process_robot_movement(self, robot_manager: RobotManager, fleet: FleetState, current_node: TimeStepNode, assignment: dict[str, str] | None = None):
+        motion = robot_manager.start_motion(fleet)
+        while motion.traveling > 0:
+            targets, times, costs = fleet.targets, fleet.times, fleet.costs
+            arrived_robots = motion.advance()
+            segment = Trajectory.between(fleet, targets, times, costs,
+                                         assignment if current_node.type == 'robot_assignment' else None)
 
-            visited_locations = copy.deepcopy(current_node.visited_locations)
+            arrived_mask = motion.arrived_mask()
 
             query_node = TimeStepNode(
-                robot_map=robot_map,
-                id = str(uuid.uuid1()),
+                fleet=fleet,
+                id = next_node_id(),
                 query = current_node.query,
                 type = 'query',
-                resolved_questions = current_node.resolved_questions,
-                next = []
+                resolution = current_node.resolution,
+                next = [],
+                visited_mask = current_node.visited_mask | arrived_mask,
+                encoding = current_node.encoding,
             )
-            query_node.visited_locations = visited_locations
-            query_node.visited_locations.update(self.check_robot_destinations(robot_map))
-            for robot in arrived_robots:
-                query_node.robot_map[robot.id].assigned_loc = ''
+            fleet.clear_assignments(arrived_robots)
 
+            # The rest of the chain only depends on the state, so an equivalent query node
+            # already carries it
+            existing = robot_manager.lookup_transposition(query_node)
+            if existing is not None:
+                robot_manager.link_segment(current_node, existing, segment, query_node.get_cost())
+                return existing
 
-            current_node.next.append(query_node)
+            robot_manager.link_segment(current_node, query_node, segment)
             current_node = query_node
-            robot_manager.update_time_step(current_node, visited_locations)
+            robot_manager.update_time_step(current_node, arrived_mask)
         return current_node
 
-    def process_combinations(self, combination: dict[str, str], robot_manager: RobotManager, current_time_step: TimeStepNode, robot_map_original: RobotMap):
-        robot_map = copy.deepcopy(robot_map_original)
-        for robot_id, location in combination.items():
-            robot_manager.assign_robot_to_location(robot_id=robot_id, location=location, robot_map=robot_map)
-        
-        self.process_robot_movement(robot_manager, robot_map, current_time_step)
+    def process_combinations(self, combination: dict[str, str], robot_manager: RobotManager, current_time_step: TimeStepNode, fleet_original: FleetState):
+        # The movement chain updates its own fleet, the arrays themselves are shared copy-on-write
+        fleet = fleet_original.copy()
+        fleet.assign(combination)
+        self.process_robot_movement(robot_manager, fleet, current_time_step, combination)
 
-    def search(self, initial_robot_map: RobotMap, initial_resolution: dict[str, str]) -> TimeStepNode:
-        robot_manager = RobotManager(
-            robot_map=copy.deepcopy(initial_robot_map),
+    def create_robot_manager(self, initial_robot_map: RobotMap, initial_resolution: dict[str, str], use_transpositions: bool = True, start_query: int | None = None, visited_mask: int = 0,
+                             horizon: int | None = None) -> RobotManager:
+        return RobotManager(
+            robot_map=initial_robot_map,
             next_question_map=self.next_query,
             initial_question=self.root_node,
             props=self.props,
             location_to_pin=self.location_to_pin,
+            locations=self.locations,
+            encoding=self.encoding,
+            bdd=self.bdd,
             pin_to_location=self.pin_to_location,
             location_to_prop=self.location_to_prop,
-            initial_resolution=copy.deepcopy(initial_resolution)
+            initial_resolution=initial_resolution,
+            use_transpositions=use_transpositions,
+            start_query=start_query,
+            visited_mask=visited_mask,
+            horizon=horizon,
         )
 
-        while robot_manager.time_step_queue: 
-            current_time_step = robot_manager.time_step_queue.pop(0)
-        
-            if not current_time_step.robot_map:
-                continue
-            
-            original_robot_map = copy.deepcopy(current_time_step.robot_map)
+    def expand_node(self, robot_manager: RobotManager, current_time_step: TimeStepNode, greedy: bool = False, deadline: float | None = None) -> bool:
+        """Expands a robot_assignment node: one movement chain per robot combination, only the
+        greedy combination, or the top_k matched ones in approximate mode.
+
+        With a `deadline`, a time.monotonic() value, the expansion checks it before every
+        combination. Once it has passed the node is left unexpanded and False is returned."""
+        current_time_step.expanded = True
+        self.search_stats['expanded'] += 1
+        if len(current_time_step.fleet) == 0:
+            return True
+
+        original_fleet = current_time_step.fleet
+        if greedy:
+            combinations = robot_manager.greedy_combination(current_time_step.query, original_fleet, current_time_step.visited_mask)
+        elif self.top_k is not None:
+            combinations = robot_manager.matched_combinations(current_time_step.query, original_fleet, current_time_step.visited_mask, self.top_k)
+        else:
             combinations = robot_manager.generate_combinations(
                 property=current_time_step.query, 
-                robot_map=original_robot_map,
-                visited_locations=current_time_step.visited_locations
+                fleet=original_fleet,
+                visited_mask=current_time_step.visited_mask
             )
 
-            for combination in combinations:
-                self.process_combinations(combination=combination,
-                                          robot_manager=robot_manager,
-                                          current_time_step=current_time_step,
-                                          robot_map_original=original_robot_map)
+        for combination in combinations:
+            if deadline is not None and time.monotonic() >= deadline:
+                current_time_step.next = []
+                current_time_step.cost_offsets = NO_OFFSETS
+                current_time_step.segments = NO_SEGMENTS
+                current_time_step.expanded = False
+                self.search_stats['expanded'] -= 1
+                return False
+            self.process_combinations(combination=combination,
+                                      robot_manager=robot_manager,
+                                      current_time_step=current_time_step,
+                                      fleet_original=original_fleet)
+        return True
+
+    def search(self, initial_robot_map: RobotMap, initial_resolution: dict[str, str], use_transpositions: bool = True, strategy: str = 'breadth_first',
+               workers: int = 1, split_depth: int = 1, start_query: int | None = None, visited_mask: int = 0, deadline: float | None = None,
+               horizon: int | None = None) -> TimeStepNode:
+        """Builds the AND-OR graph. 'breadth_first' expands the whole space, 'ao_star' only
+        expands what is needed to prove the best plan optimal and 'branch_and_bound' searches
+        depth-first, cutting branches that cannot beat a sibling. 'greedy' only follows the
+        greedy combination of every robot_assignment node.
+
+        With `workers` > 1 the first `split_depth` robot_assignment layers are expanded here and
+        the subtrees below them are searched with `strategy` in that many processes.
+
+        With a `deadline` in seconds the search is anytime: it starts from the greedy plan and
+        improves it until the deadline. search_stats then holds the worst-case cost of the
+        returned plan as 'upper_bound' and the proven 'lower_bound'.
+
+        With a `horizon` only that many query layers below the start are expanded, the
+        robot_assignment nodes after them are leaves valued with their cost plus the
+        heuristic cost-to-go, see plan_step."""
+        if deadline is not None and (workers > 1 or strategy not in ('breadth_first', 'ao_star')):
+            raise ValueError("A deadline only works with the in-process best-first search")
+        if horizon is not None and (horizon < 1 or workers > 1 or deadline is not None):
+            raise ValueError("A horizon of at least 1 only works with a single-process search without deadline")
+        self.cost_map = {}
+        self.objective_maps = {}
+        self.unsolved = set()
+        self.subplans = {}
+        self.search_stats = {'expanded': 0}
+        robot_manager = self.create_robot_manager(initial_robot_map, initial_resolution, use_transpositions, start_query, visited_mask, horizon)
+        self.robot_manager = robot_manager
+        self.run_strategy(robot_manager, strategy, workers, split_depth, deadline)
         return robot_manager.head_time_step_node
-    
 
-    def determine_cost(self, node: TimeStepNode, recursive_count:int = 0) -> float:
-        if len(node.next) == 0:
-            cost = node.get_cost()
-            self.cost_map[node.id] = cost
-            return node.get_cost()
-
-        if node.id in self.cost_map:
-            return self.cost_map[node.id]
-
-        if node.type == 'robot_moving':
-            return self.determine_cost(node.next[0], recursive_count + 1)
-
-        elif node.type == 'query':
-            cost = 0
-            for next_node in node.next:
-                cost = max(cost, self.determine_cost(next_node, recursive_count + 1))
-            return cost
-
-        elif node.type == 'robot_assignment':
-            cost = float('inf')
-            for next_node in node.next:
-                cost = min(cost, self.determine_cost(next_node, recursive_count + 1))
-            return cost
+    def run_strategy(self, robot_manager: RobotManager, strategy: str = 'breadth_first', workers: int = 1, split_depth: int = 1, deadline: float | None = None):
+        """Searches below robot_manager.head_time_step_node. Nodes that are already expanded
+        are kept, so this also resumes an earlier search."""
+        cache_hits, cache_misses = self.locations.cache_hits, self.locations.cache_misses
+        transposition_hits = robot_manager.transposition_hits
+
+        if deadline is not None:
+            AnytimeSearch(self, robot_manager, time.monotonic() + deadline).run()
+        elif workers > 1:
+            ParallelSearch(self, robot_manager, workers, split_depth, strategy).run()
+        elif strategy == 'ao_star':
+            BestFirstSearch(self, robot_manager).run()
+        elif strategy == 'branch_and_bound':
+            BranchAndBoundSearch(self, robot_manager).run()
+        elif strategy == 'breadth_first':
+            while robot_manager.time_step_queue: 
+                self.expand_node(robot_manager, robot_manager.time_step_queue.pop(0))
+        elif strategy == 'greedy':
+            while robot_manager.time_step_queue:
+                self.expand_node(robot_manager, robot_manager.time_step_queue.pop(0), greedy=True)
         else:
-            raise ValueError(f"Unknown node type: {node.type}")
-        
+            raise ValueError(f"Unknown search strategy: {strategy}")
+
+        self.search_stats['transposition_hits'] = robot_manager.transposition_hits - transposition_hits
+        self.search_stats['distance_cache_hits'] = self.locations.cache_hits - cache_hits
+        self.search_stats['distance_cache_misses'] = self.locations.cache_misses - cache_misses
+        lookups = self.search_stats['distance_cache_hits'] + self.search_stats['distance_cache_misses']
+        self.search_stats['distance_cache_hit_rate'] = self.search_stats['distance_cache_hits'] / lookups if lookups else 0.0
     
 
-    # By cost = cumulative distance traveled by all robots
-    def get_best_plan(self, initial_robot_map: RobotMap, initial_resolution: dict[str, str]) -> tuple[list[(str, tuple[int, int])], list[str]]:
-        cur_node = self.search(initial_robot_map, initial_resolution)
-        best_cost = self.determine_cost(cur_node)
+    def spawn(self) -> 'SearchTree':
+        """A tree for a separate search on the same config, which may also run in another
+        thread. The config, encoding and BDD are shared, only the per-search state is new."""
+        tree = copy.copy(self)
+        tree.locations = self.config.locations.fork()
+        tree.heuristic = self.config.heuristic.fork(tree.locations)
+        tree.cost_map = {}
+        tree.objective_maps = {}
+        tree.unsolved = set()
+        tree.subplans = {}
+        tree.search_stats = {'expanded': 0}
+        return tree
+
+    def value_map(self, objective: Objective) -> dict[int, float]:
+        """Memoized node values for `objective`. The cost values live in cost_map, where the
+        search strategies also leave their bounds."""
+        if objective.name == COST.name:
+            return self.cost_map
+        if self.subplans:
+            raise ValueError("Subtrees searched by workers or rollouts only report their cost")
+        return self.objective_maps.setdefault(objective.name, {})
+
+    def child_cost(self, node: TimeStepNode, next_node: TimeStepNode, objective: str | Objective = COST) -> float:
+        """Cost of `next_node` as seen from `node`, shifted when the child is shared through the transposition table."""
+        objective = get_objective(objective)
+        return self.determine_cost(next_node, objective) + objective.offset(node, next_node)
+
+    def leaf_cost(self, node: TimeStepNode, objective: str | Objective = COST) -> float:
+        """Value of a node without children. Frontier nodes of a receding-horizon search add
+        the heuristic estimate of the cost still to come."""
+        objective = get_objective(objective)
+        value = objective.leaf(node)
+        if objective.cost_weight and self.robot_manager.beyond_horizon(node):
+            value += objective.cost_weight * self.heuristic(node)
+        return value
+
+    def determine_cost(self, node: TimeStepNode, objective: str | Objective = COST) -> float:
+        objective = get_objective(objective)
+        values = self.value_map(objective)
+        if node.id not in values:
+            self.determine_costs(node, (objective,))
+        return values[node.id]
+
+    def determine_costs(self, node: TimeStepNode, objectives=(COST,)) -> dict[str, float]:
+        """Values of `node` for every objective, in one bottom-up pass over the part of the
+        graph below it that has no value yet. Every node's value is kept."""
+        objectives = [get_objective(objective) for objective in objectives]
+        maps = [self.value_map(objective) for objective in objectives]
+
+        stack = [node]
+        while stack:
+            current = stack[-1]
+            if all(current.id in values for values in maps):
+                stack.pop()
+                continue
+            missing = [next_node for next_node in current.next if any(next_node.id not in values for values in maps)]
+            if missing:
+                stack.extend(missing)
+                continue
+            stack.pop()
+
+            for objective, values in zip(objectives, maps):
+                if current.id in values:
+                    continue
+                if len(current.next) == 0:
+                    values[current.id] = self.leaf_cost(current, objective)
+                    continue
+
+                costs = [values[next_node.id] + objective.offset(current, next_node) for next_node in current.next]
+                if current.type == 'robot_moving':
+                    cost = costs[0]
+                elif current.type == 'query':
+                    cost = max(0, *costs)
+                elif current.type == 'robot_assignment':
+                    cost = min(costs)
+                else:
+                    raise ValueError(f"Unknown node type: {current.type}")
+                # Shared nodes are reached from several parents, so interior values are kept as well
+                values[current.id] = cost
+
+        return {objective.name: values[node.id] for objective, values in zip(objectives, maps)}
+
+    
+
+    # By cost = cumulative distance traveled by all robots, unless another objective is given
+    def get_best_plan(self, initial_robot_map: RobotMap, initial_resolution: dict[str, str], strategy: str = 'breadth_first', workers: int = 1, deadline: float | None = None,
+                      objective: str | Objective = COST) -> tuple[list[(str, tuple[int, int])], list[str]]:
+        """The search strategies prune by cost, so other objectives are only exact with the
+        complete graph of 'breadth_first'."""
+        objective = get_objective(objective)
+        # Anytime plans depend on how far the search got, so they are not cached
+        cache_key = None
+        if self.plan_cache is not None and deadline is None:
+            cache_key = self.plan_cache.key(self, initial_robot_map, initial_resolution, strategy, objective.name)
+            cached = self.plan_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        root = self.search(initial_robot_map, initial_resolution, strategy=strategy, workers=workers, deadline=deadline)
+        best_plan, best_plan_text = self.best_plan_from(root, objective)
+        if cache_key is not None:
+            self.plan_cache.put(cache_key, best_plan, best_plan_text)
+        return (best_plan, best_plan_text)
+
+    def best_plan_from(self, cur_node: TimeStepNode, objective: str | Objective = COST) -> tuple[list[(str, tuple[int, int])], list[str]]:
+        """Follows the children that realize the best value of `objective` in the searched graph below `cur_node`."""
+        objective = get_objective(objective)
+        if cur_node.id in self.subplans:
+            return self.subplans[cur_node.id]
+        best_cost = self.determine_cost(cur_node, objective)
         best_plan_text = []
         best_plan : list[(str, tuple[int, int])] = []
+        # Shared subtrees report costs relative to the branch that first created them
+        frame_offset = 0.0
         while cur_node is not None:
             # with open ('current_node.txt', 'a') as f:
             #     f.write(f"{cur_node}\n")
             for next_node in cur_node.next:
-                if (abs(self.determine_cost(next_node) - best_cost)) < COST_TOLERANCE:
+                # Partially searched children only carry a lower bound
+                if next_node.id in self.unsolved:
+                    continue
+                if (abs(self.child_cost(cur_node, next_node, objective) + frame_offset - best_cost)) < COST_TOLERANCE:
+                    frame_offset += objective.offset(cur_node, next_node)
+                    if next_node.id in self.subplans:
+                        # Searched by a worker, its plan starts with this node's assignments
+                        subplan, subplan_text = self.subplans[next_node.id]
+                        best_plan.extend(subplan)
+                        best_plan_text.extend(subplan_text)
+                        cur_node = None
+                        break
+                    if next_node.id in cur_node.segments:
+                        moving_node = cur_node.segments[next_node.id].moving_node(cur_node, next_node)
+                        best_plan_text.append(str(RobotAssignments(moving_node, self.location_to_pin)))
                     if next_node.type == 'robot_moving':
                         best_plan_text.append(str(RobotAssignments(next_node, self.location_to_pin)))
                     elif next_node.type == 'query':
@@ -237,6 +421,50 @@ class SearchTree:
 
         return (best_plan, best_plan_text)
 
+    def plan_step(self, robot_map: RobotMap, resolution: dict[str, str], horizon: int, strategy: str = 'ao_star',
+                  visited_locations: set[str] | None = None) -> tuple[list[(str, tuple[int, int])], list[str]]:
+        """Receding-horizon planning: searches `horizon` query layers below the BDD node that
+        `resolution` leads to and returns only the first combination of the best plan. The
+        executor carries it out and calls again after the next observation, so the time per
+        decision depends on the horizon, not on the size of the BDD."""
+        known, true = self.encoding.encode_resolution(resolution)
+        tests = self.bdd.test_masks(self.encoding.prop_bit)
+        query = self.bdd.root
+        while known & tests[query]:
+            query = self.bdd.high[query] if true & tests[query] else self.bdd.low[query]
+        visited_mask = self.encoding.location_mask(visited_locations or ())
+
+        root = self.search(robot_map, resolution, strategy=strategy, start_query=query, visited_mask=visited_mask, horizon=horizon)
+        start = root.next[0]
+        if len(start.next) == 0:
+            return ([], [])
+        best_cost = self.determine_cost(start)
+        for next_node in start.next:
+            if next_node.id not in self.unsolved and abs(self.child_cost(start, next_node) - best_cost) < COST_TOLERANCE:
+                break
+        else:
+            raise ValueError("The search did not settle the first decision")
+
+        assignment = start.segments[next_node.id].assignment or {}
+        plan = [(robot_id, self.location_to_pin[location]) for robot_id, location in assignment.items()]
+        plan_text = [f"{robot_id} -> {location}" for robot_id, location in assignment.items()]
+        return (plan, plan_text)
+
+    def export_policy(self, root: TimeStepNode | None = None) -> Policy:
+        """Best combination for every decision point of the optimal policy, for execution
+        without the search graph."""
+        if root is None:
+            root = self.robot_manager.head_time_step_node
+        self.determine_cost(root)
+        return Policy.from_search(self, root)
+
+    def compact(self, root: TimeStepNode | None = None) -> NodeArena:
+        """Columnar copy of the searched graph below `root`."""
+        if root is None:
+            root = self.robot_manager.head_time_step_node
+        self.determine_cost(root)
+        return NodeArena(root, self.cost_map)
+
 # search_tree = SearchTree()
 # initial_robot_map = RobotMap({
 #     'robot_1': Robot(id='robot_1', position=(1, 1)),
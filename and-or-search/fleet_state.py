@@ -0,0 +1,264 @@
+import copy
+import heapq
+import numpy as np
+from robot_class import Robot, RobotMap
+
+DISTANCE_TOLERANCE = 0.01
+
+def grid_cell(position) -> tuple[int, int]:
+    return (int(round(position[0] / DISTANCE_TOLERANCE)), int(round(position[1] / DISTANCE_TOLERANCE)))
+
+class LocationTable:
+    """Location names, pins and pairwise distances, shared by every fleet of a search.
+
+    Distances from robot positions are cached per position on the DISTANCE_TOLERANCE grid.
+    Robots spend most of the search parked on a pin or replaying the same moves in sibling
+    branches, so most lookups hit."""
+    CACHE_LIMIT = 100_000
+
+    def __init__(self, location_to_pin: dict[str, tuple[int, int]]):
+        self.names : tuple[str, ...] = tuple(location_to_pin.keys())
+        self.index : dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.pins : np.ndarray = np.array([location_to_pin[name] for name in self.names], dtype=float).reshape(-1, 2)
+
+        offsets = self.pins[:, None, :] - self.pins[None, :, :]
+        self.distances : np.ndarray = np.hypot(offsets[..., 0], offsets[..., 1])
+
+        self.position_cache : dict[tuple[int, int], np.ndarray] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.clear_cache()
+
+    def fork(self) -> 'LocationTable':
+        """A table over the same locations and distances with its own position cache and
+        counters, for a search that runs next to others."""
+        table = copy.copy(self)
+        table.cache_hits = 0
+        table.cache_misses = 0
+        table.clear_cache()
+        return table
+
+    def clear_cache(self):
+        """Drops cached rows, the rows of the location pins stay."""
+        self.position_cache = {}
+        for i, pin in enumerate(self.pins):
+            self.position_cache[grid_cell(pin)] = self.distances[i]
+
+    def distances_from(self, positions: np.ndarray) -> np.ndarray:
+        """Distance from every position (one per row) to every location."""
+        rows = []
+        for position in positions:
+            cell = grid_cell(position)
+            row = self.position_cache.get(cell)
+            if row is None:
+                self.cache_misses += 1
+                if len(self.position_cache) >= self.CACHE_LIMIT:
+                    self.clear_cache()
+                offsets = self.pins - position
+                row = np.hypot(offsets[:, 0], offsets[:, 1])
+                self.position_cache[cell] = row
+            else:
+                self.cache_hits += 1
+            rows.append(row)
+        return np.array(rows, dtype=float).reshape(len(positions), len(self.names))
+
+
+class FleetState:
+    """Structure-of-arrays robot state: one row per robot in `ids` order.
+
+    The arrays are never written to. An update binds a new array to the field and leaves the
+    old one to the snapshots that still hold it, so copy() only copies references. `targets`
+    holds location indices into `locations`, -1 for an unassigned robot."""
+    __slots__ = ('ids', 'index', 'locations', 'positions', 'targets', 'velocities', 'times', 'costs')
+
+    def __init__(self, ids, index, locations: LocationTable, positions: np.ndarray, targets: np.ndarray, velocities: np.ndarray, times: np.ndarray, costs: np.ndarray):
+        self.ids : tuple[str, ...] = ids
+        self.index : dict[str, int] = index
+        self.locations = locations
+        self.positions = positions
+        self.targets = targets
+        self.velocities = velocities
+        self.times = times
+        self.costs = costs
+
+    @classmethod
+    def from_robot_map(cls, robot_map: RobotMap, locations: LocationTable) -> 'FleetState':
+        robots = list(robot_map.values())
+        ids = tuple(robot_map.keys())
+        return cls(
+            ids = ids,
+            index = {robot_id: i for i, robot_id in enumerate(ids)},
+            locations = locations,
+            positions = np.array([robot.position for robot in robots], dtype=float).reshape(-1, 2),
+            targets = np.array([locations.index[robot.assigned_loc] if robot.assigned_loc else -1 for robot in robots], dtype=np.intp),
+            velocities = np.array([robot.velocity for robot in robots], dtype=float),
+            times = np.array([robot.time for robot in robots], dtype=float),
+            costs = np.array([robot.cost for robot in robots], dtype=float),
+        )
+
+    def copy(self) -> 'FleetState':
+        return FleetState(self.ids, self.index, self.locations, self.positions, self.targets, self.velocities, self.times, self.costs)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def robot(self, robot_id: str) -> Robot:
+        i = self.index[robot_id]
+        target = self.targets[i]
+        robot = Robot(
+            id = robot_id,
+            position = (float(self.positions[i, 0]), float(self.positions[i, 1])),
+            assigned_loc = self.locations.names[target] if target >= 0 else '',
+            cost = float(self.costs[i]),
+            time = float(self.times[i]),
+        )
+        robot.velocity = float(self.velocities[i])
+        return robot
+
+    def robot_map(self) -> RobotMap:
+        """Builds a Robot per row. Only meant for reporting, the search works on the arrays."""
+        return {robot_id: self.robot(robot_id) for robot_id in self.ids}
+
+    def assigned_loc(self, robot_id: str) -> str:
+        target = self.targets[self.index[robot_id]]
+        return self.locations.names[target] if target >= 0 else ''
+
+    def assign(self, combination: dict[str, str]):
+        targets = self.targets.copy()
+        for robot_id, location in combination.items():
+            targets[self.index[robot_id]] = self.locations.index[location]
+        self.targets = targets
+
+    def clear_assignments(self, mask: np.ndarray):
+        if mask.any():
+            self.targets = np.where(mask, -1, self.targets)
+
+    def target_positions(self) -> np.ndarray:
+        """Pin of each robot's target, or its own position when it has none."""
+        if len(self.locations.names) == 0:
+            return self.positions
+        assigned = self.targets >= 0
+        return np.where(assigned[:, None], self.locations.pins[self.targets], self.positions)
+
+    def target_distances(self) -> np.ndarray:
+        """Distance of each robot to its target, 0 for unassigned robots."""
+        if len(self.locations.names) == 0:
+            return np.zeros(len(self.ids))
+        assigned = self.targets >= 0
+        rows = self.locations.distances_from(self.positions)
+        return np.where(assigned, rows[np.arange(len(self.ids)), self.targets], 0.0)
+
+    def arrived_mask(self) -> int:
+        """Location mask of the targets that robots are standing on."""
+        mask = (self.targets >= 0) & (self.target_distances() < DISTANCE_TOLERANCE)
+        arrived = 0
+        for target in self.targets[mask].tolist():
+            arrived |= 1 << target
+        return arrived
+
+    def twins(self) -> list[int]:
+        """For each robot, the closest previous robot it is interchangeable with (same grid cell,
+        time, velocity and target), -1 when there is none."""
+        cells = np.rint(self.positions / DISTANCE_TOLERANCE).astype(np.int64).tolist()
+        times = np.rint(self.times / DISTANCE_TOLERANCE).astype(np.int64).tolist()
+        velocities = self.velocities.tolist()
+        targets = self.targets.tolist()
+        last : dict[tuple, int] = {}
+        twins = []
+        for i in range(len(self.ids)):
+            key = (cells[i][0], cells[i][1], times[i], velocities[i], targets[i])
+            twins.append(last.get(key, -1))
+            last[key] = i
+        return twins
+
+    def key(self) -> tuple:
+        """Robot part of the transposition key: positions and times on the DISTANCE_TOLERANCE
+        grid plus targets. Costs are left out on purpose."""
+        return (
+            self.ids,
+            np.rint(self.positions / DISTANCE_TOLERANCE).astype(np.int64).tobytes(),
+            np.rint(self.times / DISTANCE_TOLERANCE).astype(np.int64).tobytes(),
+            self.targets.tobytes(),
+        )
+
+    def total_cost(self) -> float:
+        return float(self.costs.sum())
+
+    def max_time(self) -> float:
+        return float(self.times.max()) if len(self.ids) else 0.0
+
+
+class FleetMotion:
+    """Arrival events of a fleet after an assignment.
+
+    Every assigned robot moves in a straight line from where it stood at `departures` to its
+    target pin, so its arrival time is known up front and positions at any later time follow
+    from (start, target, departure). The next event comes off a heap of arrival times.
+    advance() only computes the robots still in flight: their positions at the event, and
+    costs derived from the start of the motion, so no error builds up over the events.
+    Robots that are parked or already arrived are left as they are. In-flight robots are
+    still computed at every event, because the node of an event is keyed on the whole
+    fleet's positions (see FleetState.key)."""
+
+    def __init__(self, fleet: FleetState):
+        self.fleet = fleet
+        self.starts = fleet.positions
+        self.ends = fleet.target_positions()
+        self.departures = fleet.times
+        self.start_costs = fleet.costs
+        self.distances = fleet.target_distances()
+        assigned = fleet.targets >= 0
+        self.done = ~assigned | (self.distances < DISTANCE_TOLERANCE)
+        # Robots standing on their target, they snap onto it at the first event and their
+        # targets are cleared at the next one
+        self.pending = assigned & self.done
+        self.in_flight = np.flatnonzero(~self.done)
+        arrivals = self.departures + self.distances / fleet.velocities
+        self.heap = [(float(arrivals[i]), i) for i in self.in_flight.tolist()]
+        heapq.heapify(self.heap)
+        self.traveling = len(self.heap)
+
+    def advance(self) -> np.ndarray:
+        """Moves the fleet to the next arrival. Returns the mask of robots that had already
+        arrived before, the caller clears their targets."""
+        fleet = self.fleet
+        now = self.heap[0][0]
+        flying = self.in_flight
+        # Robots within DISTANCE_TOLERANCE of their target arrive together with the first one
+        traveled = fleet.velocities[flying] * (now - self.departures[flying])
+        distances = self.distances[flying]
+        reached = distances - traveled < DISTANCE_TOLERANCE
+        self.traveling -= int(np.count_nonzero(reached))
+
+        fraction = np.minimum(traveled / distances, 1.0)
+        positions = fleet.positions.copy()
+        costs = fleet.costs.copy()
+        positions[flying] = np.where(reached[:, None], self.ends[flying],
+                                     self.starts[flying] + (self.ends[flying] - self.starts[flying]) * fraction[:, None])
+        costs[flying] = self.start_costs[flying] + np.where(reached, distances, traveled)
+        cleared = self.pending
+        if cleared.any():
+            positions[cleared] = self.ends[cleared]
+            costs[cleared] = self.start_costs[cleared] + self.distances[cleared]
+        fleet.positions = positions
+        fleet.costs = costs
+        fleet.times = np.full_like(fleet.times, now)
+
+        arrived = flying[reached]
+        self.pending = np.zeros_like(self.done)
+        self.pending[arrived] = True
+        self.done = self.done.copy()
+        self.done[arrived] = True
+        self.in_flight = flying[~reached]
+        # Entries of robots that arrived early stay in the heap until they reach the top
+        while self.heap and self.done[self.heap[0][1]]:
+            heapq.heappop(self.heap)
+        return cleared
+
+    def arrived_mask(self) -> int:
+        """Location mask of the targets that robots are standing on."""
+        mask = (self.fleet.targets >= 0) & self.done
+        arrived = 0
+        for target in self.fleet.targets[mask].tolist():
+            arrived |= 1 << target
+        return arrived
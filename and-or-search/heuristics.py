@@ -0,0 +1,150 @@
+import copy
+import numpy as np
+from bdd_compiler import CompiledBDD
+from fleet_state import LocationTable
+from state_encoding import StateEncoding
+from time_step_node_class import TimeStepNode
+
+
+class Heuristic:
+    """Lower bound on the cost still to come below a node. The base class estimates nothing,
+    for comparing against the other heuristics. The tables built from the config are shared,
+    fork() gives a copy that looks distances up in another location table."""
+
+    def __init__(self, bdd: CompiledBDD, encoding: StateEncoding, locations: LocationTable):
+        self.bdd = bdd
+        self.encoding = encoding
+        self.locations = locations
+
+    def fork(self, locations: LocationTable) -> 'Heuristic':
+        heuristic = copy.copy(self)
+        heuristic.locations = locations
+        return heuristic
+
+    def __call__(self, node: TimeStepNode) -> float:
+        return 0.0
+
+
+class NearestLocationHeuristic(Heuristic):
+    """Straight-line distance from the nearest robot to the nearest location that can still
+    answer the node's BDD variable. Every combination sends some robot there, so the bound
+    never overestimates."""
+
+    def __init__(self, bdd: CompiledBDD, encoding: StateEncoding, locations: LocationTable):
+        super().__init__(bdd, encoding, locations)
+        self.query_locations = [0 if bdd.is_terminal(node) else encoding.prop_locations[bdd.var_name(node)]
+                                for node in range(len(bdd))]
+
+    def __call__(self, node: TimeStepNode) -> float:
+        if self.bdd.is_terminal(node.query) or len(node.fleet) == 0:
+            return 0.0
+
+        encoding = self.encoding
+        known_props = encoding.known_props(node.visited_mask)
+        allowed = (self.query_locations[node.query]
+                   & ~node.visited_mask
+                   & encoding.informative_locations(known_props))
+        columns = list(encoding.bits(allowed))
+
+        # No location left for the variable, the node has no combinations and is a leaf
+        if not columns:
+            return 0.0
+        return float(self.locations.distances_from(node.fleet.positions)[:, columns].min())
+
+
+class CoverHeuristic(Heuristic):
+    """Lower bound on the travel needed to observe the props that the rest of the plan has
+    to observe, whatever the outcomes.
+
+    Below a BDD node, a prop tested on every path to a terminal is observed on every run, so
+    `required[node]` holds the node's own prop plus the props required by both children. The
+    outcome of the node's own test is up to the environment, so the bound takes the worse of
+    the two children. Robots observe a prop by reaching one of its locations, and their paths
+    form a forest rooted at the robot positions. Merging those roots into one, the forest
+    spans the root and one location per prop, so it is at least as long as the minimum
+    spanning tree over the props with the closest distance between their location sets, and
+    from the root the closest distance from any robot. Props without any location can never
+    be observed, a node testing one is a dead end and requires nothing. A node can also ask
+    for a prop that is already known, its bound is the one of the node the answer leads to."""
+
+    def __init__(self, bdd: CompiledBDD, encoding: StateEncoding, locations: LocationTable):
+        super().__init__(bdd, encoding, locations)
+        props = encoding.props
+        # Prop x location incidence and the closest distance between the locations of two props
+        self.incidence = np.array([[bool(encoding.prop_locations[prop] >> column & 1) for column in range(len(encoding.location_names))]
+                                   for prop in props], dtype=bool).reshape(len(props), len(encoding.location_names))
+        self.prop_distances = np.full((len(props), len(props)), np.inf)
+        for i in range(len(props)):
+            for j in range(len(props)):
+                if self.incidence[i].any() and self.incidence[j].any():
+                    self.prop_distances[i, j] = locations.distances[np.ix_(self.incidence[i], self.incidence[j])].min()
+
+        observable = 0
+        for i, prop in enumerate(props):
+            if self.incidence[i].any():
+                observable |= encoding.prop_bit[prop]
+
+        tests = bdd.test_masks(encoding.prop_bit)
+        self.tests = tests
+        required = [0] * len(bdd)
+        # Per BDD node, the props each outcome of its test leaves to observe
+        self.branches : list[tuple[int, ...]] = [()] * len(bdd)
+        # Children come first, so one pass in id order is enough
+        for node in range(len(bdd)):
+            if bdd.is_terminal(node) or not tests[node] & observable:
+                continue
+            required[node] = tests[node] | (required[bdd.low[node]] & required[bdd.high[node]])
+            self.branches[node] = tuple({tests[node] | required[bdd.low[node]], tests[node] | required[bdd.high[node]]})
+        self.required = required
+
+    def tree_bound(self, props: list[int], reach: np.ndarray) -> float:
+        """Prim's algorithm over the root and `props`, `reach` is the root's distance to each prop."""
+        distances = reach[props].tolist()
+        pending = list(range(len(props)))
+        total = 0.0
+        while pending:
+            index = min(pending, key=lambda i: distances[i])
+            total += distances[index]
+            pending.remove(index)
+            row = self.prop_distances[props[index]]
+            for i in pending:
+                distance = row[props[i]]
+                if distance < distances[i]:
+                    distances[i] = distance
+        return total
+
+    def __call__(self, node: TimeStepNode) -> float:
+        if len(node.fleet) == 0:
+            return 0.0
+        encoding = self.encoding
+        known, true = node.resolution
+        query = node.query
+        while self.tests[query] & known:
+            query = self.bdd.high[query] if self.tests[query] & true else self.bdd.low[query]
+        known |= encoding.known_props(node.visited_mask)
+        branches = self.branches[query]
+        if not branches:
+            return 0.0
+
+        # Closest robot to every location, then to every prop
+        location_reach = self.locations.distances_from(node.fleet.positions).min(axis=0)
+        reach = np.where(self.incidence, location_reach, np.inf).min(axis=1)
+
+        bound = 0.0
+        for mask in branches:
+            props = list(encoding.bits(mask & ~known))
+            if props:
+                bound = max(bound, self.tree_bound(props, reach))
+        return bound
+
+
+HEURISTICS = {
+    'none': Heuristic,
+    'nearest': NearestLocationHeuristic,
+    'cover': CoverHeuristic,
+}
+
+def make_heuristic(name: str, bdd: CompiledBDD, encoding: StateEncoding, locations: LocationTable) -> Heuristic:
+    if name not in HEURISTICS:
+        raise ValueError(f"Unknown heuristic: {name}")
+    return HEURISTICS[name](bdd, encoding, locations)
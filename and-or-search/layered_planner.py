@@ -0,0 +1,124 @@
+import importlib.util
+import os
+import time
+import numpy as np
+from create_plan import SearchTree
+from fleet_state import DISTANCE_TOLERANCE
+from robot_class import RobotMap
+from robot_manager import RobotManager
+
+# support_placement lives with interactive_circles, it is loaded from its file so that
+# importing the planner leaves sys.path alone
+SUPPORT_PLACEMENT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'layered-hard-coded-approach', 'support_placement.py')
+_spec = importlib.util.spec_from_file_location('support_placement', SUPPORT_PLACEMENT_PATH)
+support_placement = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(support_placement)
+minimax_point, minimax_scores = support_placement.minimax_point, support_placement.minimax_scores
+
+
+class LayeredPlanner:
+    """Fast approximate planner after the layered approach of interactive_circles, for configs
+    too large for the AND-OR search.
+
+    Every BDD node the plan reaches is a layer. The robot closest to a location that answers
+    the node's test is the mover and goes there. The other robots are supports: while the
+    mover travels, each one moves within the distance it covers in that time to the minimax
+    point over the locations the next layer can ask for, given where the mover and the other
+    robots stand (see support_placement.minimax_point). Supports only move when that lowers
+    their score. Every outcome of the mover's observation gets its own layers, and like
+    get_best_plan the returned plan follows the worst one.
+
+    Robots are planned as unassigned, targets in the initial robot map are ignored. Support
+    moves end at free positions, so their pins are not necessarily location pins."""
+
+    def __init__(self, search_tree: SearchTree | None = None, bdd_config: dict | None = None):
+        """Plans on the config of `search_tree`, or of a new SearchTree over `bdd_config`
+        (generated_bdd.json when neither is given)."""
+        self.search_tree = search_tree if search_tree is not None else SearchTree(bdd_config=bdd_config, heuristic='none')
+        self.search_stats: dict[str, float] = {}
+
+    def get_best_plan(self, initial_robot_map: RobotMap, initial_resolution: dict[str, str]) -> tuple[list[(str, tuple[float, float])], list[str]]:
+        """search_stats then holds the worst-case cost and time of the plan, the number of
+        layers planned over all outcomes and the seconds it took."""
+        start = time.perf_counter()
+        self.search_stats = {'layers': 0}
+        manager = self.search_tree.create_robot_manager(initial_robot_map, initial_resolution, use_transpositions=False)
+        fleet = manager.head_time_step_node.fleet
+        root = manager.head_time_step_node
+
+        cost, makespan, plan, plan_text = self.plan_layer(manager, fleet.ids, fleet.velocities, fleet.positions, fleet.times, fleet.costs,
+                                                          root.query, root.resolution, root.visited_mask)
+        self.search_stats['cost'] = cost
+        self.search_stats['time'] = makespan
+        self.search_stats['seconds'] = time.perf_counter() - start
+        return (plan, plan_text)
+
+    def plan_layer(self, manager: RobotManager, ids: tuple[str, ...], velocities: np.ndarray, positions: np.ndarray, times: np.ndarray, costs: np.ndarray,
+                   query: int, resolution: tuple[int, int], visited_mask: int) -> tuple[float, float, list, list]:
+        """Cost, time, plan and plan text of the worst outcome below the layer at `query`."""
+        encoding, locations = manager.encoding, manager.locations
+        query = manager.next_question(query, resolution)
+        allowed = (manager.query_locations[query]
+                   & ~visited_mask
+                   & encoding.informative_locations(encoding.known_props(visited_mask)))
+        # A terminal, or a test that no location can answer anymore
+        if allowed == 0 or len(ids) == 0:
+            return float(costs.sum()), max(0.0, float(times.max(initial=0.0))), [], []
+        self.search_stats['layers'] += 1
+
+        columns = list(encoding.bits(allowed))
+        distances = locations.distances_from(positions)[:, columns]
+        mover, column = np.unravel_index(np.argmin(distances), distances.shape)
+        location = columns[column]
+        travel = float(distances[mover, column])
+        arrival = float(times[mover]) + travel / velocities[mover]
+
+        visited_mask |= 1 << location
+        known_props = encoding.known_props(visited_mask)
+        # One outcome per class of the revealed props that leads to a different subtree
+        outcomes = []
+        outcome_classes = set()
+        for outcome in manager.possible_resolutions(resolution, known_props, manager.support[query]):
+            next_query = manager.next_question(query, outcome)
+            relevant = manager.support[next_query]
+            outcome_class = (next_query, outcome[0] & relevant, outcome[1] & relevant)
+            if outcome_class not in outcome_classes:
+                outcome_classes.add(outcome_class)
+                outcomes.append((next_query, outcome))
+
+        informative = encoding.informative_locations(known_props)
+        next_locations = 0
+        for next_query, _ in outcomes:
+            next_locations |= manager.query_locations[next_query] & ~visited_mask & informative
+        next_targets = locations.pins[list(encoding.bits(next_locations))]
+
+        location_name = encoding.location_names[location]
+        plan = [(ids[mover], self.search_tree.location_to_pin[location_name])]
+        plan_text = [f"{ids[mover]} -> {location_name}"]
+        positions, costs = positions.copy(), costs.copy()
+        positions[mover] = locations.pins[location]
+        costs[mover] += travel
+        if len(next_targets):
+            for support in range(len(ids)):
+                if support == mover:
+                    continue
+                radius = max(arrival - float(times[support]), 0.0) * velocities[support]
+                others = np.delete(positions, support, axis=0)
+                point, score = minimax_point(positions[support], radius, others, next_targets)
+                if score < minimax_scores(positions[support], others, next_targets)[0] - DISTANCE_TOLERANCE:
+                    costs[support] += float(np.linalg.norm(point - positions[support]))
+                    positions[support] = point
+                    plan.append((ids[support], (float(point[0]), float(point[1]))))
+                    plan_text.append(f"{ids[support]} supports at ({point[0]:.2f}, {point[1]:.2f})")
+        # The next layer starts when the mover observes, the supports wait for it
+        times = np.maximum(times, arrival)
+
+        worst = None
+        for next_query, outcome in outcomes:
+            branch = self.plan_layer(manager, ids, velocities, positions, times, costs, next_query, outcome, visited_mask)
+            if worst is None or branch[0] > worst[0]:
+                worst = branch
+                worst_resolution = outcome
+        cost, makespan, next_plan, next_plan_text = worst
+        plan_text.append(encoding.decode_resolution(worst_resolution))
+        return cost, makespan, plan + next_plan, plan_text + next_plan_text
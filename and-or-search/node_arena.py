@@ -0,0 +1,100 @@
+import numpy as np
+from time_step_node_class import TimeStepNode
+
+NODE_TYPES = ('query', 'robot_assignment', 'robot_moving')
+QUERY, ROBOT_ASSIGNMENT, ROBOT_MOVING = range(len(NODE_TYPES))
+
+
+class NodeArena:
+    """Columnar copy of a search graph.
+
+    Node i of the arena has `types[i]`, `queries[i]` and the original `ids[i]`, and its
+    children are `children[child_offsets[i]:child_offsets[i + 1]]` with the transposition
+    shifts in `edge_offsets` at the same positions. `parents[i]` is the parent the node was
+    first reached from, -1 for the root. Leaves keep their value from the tree's cost_map, so
+    subtrees searched by workers or rollouts stay leaves here as well. The graph objects can
+    be dropped afterwards, the arena takes a few dozen bytes per node."""
+
+    def __init__(self, root: TimeStepNode, cost_map: dict[int, float] | None = None):
+        cost_map = cost_map or {}
+        type_codes = {name: code for code, name in enumerate(NODE_TYPES)}
+        index : dict[int, int] = {root.id: 0}
+        nodes = [root]
+        parents = [-1]
+        # Nodes are numbered in breadth-first order, so every node comes after its first parent
+        position = 0
+        while position < len(nodes):
+            node = nodes[position]
+            for next_node in node.next:
+                if next_node.id not in index:
+                    index[next_node.id] = len(nodes)
+                    nodes.append(next_node)
+                    parents.append(position)
+            position += 1
+
+        size = len(nodes)
+        self.index = index
+        self.ids = np.fromiter((node.id for node in nodes), dtype=np.int64, count=size)
+        self.types = np.fromiter((type_codes[node.type] for node in nodes), dtype=np.int8, count=size)
+        self.queries = np.fromiter((node.query for node in nodes), dtype=np.int32, count=size)
+        self.parents = np.array(parents, dtype=np.int32)
+        self.child_offsets = np.zeros(size + 1, dtype=np.int64)
+        self.child_offsets[1:] = np.cumsum([len(node.next) for node in nodes])
+        edges = int(self.child_offsets[-1])
+        self.children = np.fromiter((index[next_node.id] for node in nodes for next_node in node.next), dtype=np.int32, count=edges)
+        self.edge_offsets = np.fromiter((node.cost_offsets.get(next_node.id, 0.0) for node in nodes for next_node in node.next),
+                                        dtype=np.float64, count=edges)
+        self.leaf_costs = np.fromiter((cost_map.get(node.id, node.get_cost()) if len(node.next) == 0 else np.nan for node in nodes),
+                                      dtype=np.float64, count=size)
+        self._costs : np.ndarray | None = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in (self.ids, self.types, self.queries, self.parents,
+                                              self.child_offsets, self.children, self.edge_offsets, self.leaf_costs))
+
+    def next(self, node: int) -> np.ndarray:
+        return self.children[self.child_offsets[node]:self.child_offsets[node + 1]]
+
+    def postorder(self) -> list[int]:
+        """Every node after all of its children."""
+        order = []
+        done = np.zeros(len(self), dtype=bool)
+        stack = [(0, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if done[node]:
+                continue
+            if children_done:
+                done[node] = True
+                order.append(node)
+                continue
+            stack.append((node, True))
+            stack.extend((int(next_node), False) for next_node in self.next(node) if not done[next_node])
+        return order
+
+    def costs(self) -> np.ndarray:
+        """Value of every node, combined like SearchTree.determine_cost."""
+        if self._costs is not None:
+            return self._costs
+        costs = self.leaf_costs.copy()
+        for node in self.postorder():
+            start, end = self.child_offsets[node], self.child_offsets[node + 1]
+            if start == end:
+                continue
+            values = costs[self.children[start:end]] + self.edge_offsets[start:end]
+            node_type = self.types[node]
+            if node_type == ROBOT_MOVING:
+                costs[node] = values[0]
+            elif node_type == QUERY:
+                costs[node] = max(0.0, values.max())
+            else:
+                costs[node] = values.min()
+        self._costs = costs
+        return costs
+
+    def cost(self, node_id: int) -> float:
+        return float(self.costs()[self.index[node_id]])
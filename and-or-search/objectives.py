@@ -0,0 +1,45 @@
+from time_step_node_class import TimeStepNode
+
+
+class Objective:
+    """What a plan is scored by: `cost_weight` times the distance traveled by all robots
+    (get_cost) plus `time_weight` times the makespan (get_time).
+
+    Transposition offsets only shift costs, the transposition key already matches robot
+    times, so a shared child's value is shifted by the cost part of the objective only."""
+
+    def __init__(self, name: str, cost_weight: float = 1.0, time_weight: float = 0.0):
+        self.name = name
+        self.cost_weight = cost_weight
+        self.time_weight = time_weight
+
+    def leaf(self, node: TimeStepNode) -> float:
+        value = 0.0
+        if self.cost_weight:
+            value += self.cost_weight * node.get_cost()
+        if self.time_weight:
+            value += self.time_weight * node.get_time()
+        return value
+
+    def offset(self, node: TimeStepNode, next_node: TimeStepNode) -> float:
+        return self.cost_weight * node.cost_offsets.get(next_node.id, 0.0)
+
+    def __repr__(self):
+        return f"Objective({self.name!r}, cost_weight={self.cost_weight}, time_weight={self.time_weight})"
+
+
+COST = Objective('cost')
+MAKESPAN = Objective('makespan', cost_weight=0.0, time_weight=1.0)
+OBJECTIVES = {objective.name: objective for objective in (COST, MAKESPAN)}
+
+
+def weighted(cost_weight: float, time_weight: float) -> Objective:
+    return Objective(f"weighted({cost_weight}, {time_weight})", cost_weight, time_weight)
+
+
+def get_objective(objective: str | Objective) -> Objective:
+    if isinstance(objective, Objective):
+        return objective
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective: {objective}")
+    return OBJECTIVES[objective]
@@ -0,0 +1,67 @@
+from concurrent.futures import ProcessPoolExecutor
+from robot_manager import RobotManager
+from time_step_node_class import TimeStepNode
+
+# Search tree of each worker process, built once from the parent's config
+_worker_tree = None
+
+def _init_worker(bdd_config: dict, reduce_bdd: bool, optimize_bdd_order: bool, heuristic: str, top_k: int | None):
+    global _worker_tree
+    from create_plan import SearchTree
+    _worker_tree = SearchTree(reduce_bdd=reduce_bdd, optimize_bdd_order=optimize_bdd_order, bdd_config=bdd_config, heuristic=heuristic, top_k=top_k)
+
+def _search_subtree(robot_map, query: int, resolution: dict[str, str], visited_mask: int, strategy: str):
+    """Searches the subtree of one frontier node, returns its cost, its best plan and the
+    number of expanded nodes."""
+    tree = _worker_tree
+    root = tree.search(robot_map, resolution, strategy=strategy, start_query=query, visited_mask=visited_mask)
+    cost = tree.determine_cost(root)
+    plan, plan_text = tree.best_plan_from(root)
+    return cost, plan, [str(entry) if not isinstance(entry, dict) else dict(entry) for entry in plan_text], tree.search_stats['expanded']
+
+
+class ParallelSearch:
+    """Expands the top `split_depth` robot_assignment layers in this process and searches
+    the robot_assignment nodes below them in a process pool.
+
+    The subtrees below the frontier are independent, so each worker only sends back the
+    subtree's cost and its best plan. The frontier nodes become leaves valued with that
+    cost, determine_cost merges them with its usual min/max and get_best_plan splices the
+    worker plan in when it reaches one."""
+
+    def __init__(self, search_tree, robot_manager: RobotManager, workers: int, split_depth: int = 1, strategy: str = 'breadth_first'):
+        self.search_tree = search_tree
+        self.robot_manager = robot_manager
+        self.workers = workers
+        self.split_depth = split_depth
+        self.strategy = strategy
+
+    def frontier(self) -> list[TimeStepNode]:
+        queue = self.robot_manager.time_step_queue
+        for _ in range(self.split_depth):
+            layer = list(queue)
+            queue.clear()
+            for node in layer:
+                self.search_tree.expand_node(self.robot_manager, node)
+        frontier = list(queue)
+        queue.clear()
+        return frontier
+
+    def run(self) -> TimeStepNode:
+        root = self.robot_manager.head_time_step_node
+        frontier = self.frontier()
+        if not frontier:
+            return root
+
+        tree = self.search_tree
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(tree.bdd_config, tree.reduce_bdd, tree.optimize_bdd_order, tree.heuristic_name, tree.top_k)) as pool:
+            futures = [pool.submit(_search_subtree, node.robot_map, node.query, dict(node.resolved_questions),
+                                   node.visited_mask, self.strategy)
+                       for node in frontier]
+            for node, future in zip(frontier, futures):
+                cost, plan, plan_text, expanded = future.result()
+                tree.cost_map[node.id] = cost
+                tree.subplans[node.id] = (plan, plan_text)
+                tree.search_stats['expanded'] += expanded
+        return root
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from robot_class import RobotMap
+
+PLAN_CACHE_MAGIC = b'AOPC'
+PLAN_CACHE_VERSION = 1
+# version, header size, number of plan steps
+_HEADER = struct.Struct('<HII')
+# robot index, pin index
+_STEP = struct.Struct('<HH')
+_SUFFIX = '.plan'
+
+
+def plan_key(search_tree, robot_map: RobotMap, resolution: dict[str, str], strategy: str, quantum: float, objective: str = 'cost') -> str:
+    """Content hash of everything the plan of a search depends on. Robot positions, costs
+    and times are rounded to multiples of `quantum`, so robots that stand within that of the
+    cached ones share its plan."""
+    bdd = search_tree.bdd
+    robots = sorted((robot_id, [round(coordinate / quantum) for coordinate in robot.position], robot.assigned_loc,
+                     round(robot.cost / quantum), round(robot.time / quantum), robot.velocity)
+                    for robot_id, robot in robot_map.items())
+    content = {
+        'bdd': [bdd.variables, bdd.level, bdd.low, bdd.high, bdd.root],
+        'locations': sorted((name, list(pin)) for name, pin in search_tree.location_to_pin.items()),
+        'prop_to_location': sorted((prop, sorted(locs)) for prop, locs in search_tree.prop_to_location.items()),
+        'robots': robots,
+        'resolution': sorted(resolution.items()),
+        'strategy': strategy,
+        'top_k': search_tree.top_k,
+        'objective': objective,
+    }
+    return hashlib.sha256(json.dumps(content, separators=(',', ':')).encode()).hexdigest()
+
+
+class PlanCache:
+    """Best plans of earlier searches in a directory, one file per key.
+
+    A file holds a small JSON header with the robot ids, the pins and the plan text, followed
+    by the plan as fixed-size (robot index, pin index) pairs. Reads go through mmap. The
+    modification time of a file is its last use, so once the files outgrow `max_bytes` the
+    least recently used ones are removed."""
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024, quantum: float = 0.01):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.quantum = quantum
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, search_tree, robot_map: RobotMap, resolution: dict[str, str], strategy: str, objective: str = 'cost') -> str:
+        return plan_key(search_tree, robot_map, resolution, strategy, self.quantum, objective)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key: str) -> tuple[list, list] | None:
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                plan = self.decode(data)
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (ValueError, struct.error, KeyError, IndexError, TypeError):
+            # Truncated or corrupt, the next put writes it again
+            self.misses += 1
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+        self.hits += 1
+        return plan
+
+    def put(self, key: str, plan: list, plan_text: list):
+        path = self.path(key)
+        # Unique per process and thread, concurrent writers of one key each replace it whole
+        partial = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(partial, 'wb') as file:
+            file.write(self.encode(plan, plan_text))
+        os.replace(partial, path)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(_SUFFIX):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    @staticmethod
+    def encode(plan: list, plan_text: list) -> bytes:
+        robot_ids, pins = [], []
+        robot_index, pin_index = {}, {}
+        steps = []
+        for robot_id, pin in plan:
+            pin = tuple(pin)
+            if robot_id not in robot_index:
+                robot_index[robot_id] = len(robot_ids)
+                robot_ids.append(robot_id)
+            if pin not in pin_index:
+                pin_index[pin] = len(pins)
+                pins.append(pin)
+            steps.append(_STEP.pack(robot_index[robot_id], pin_index[pin]))
+
+        header = json.dumps({
+            'robot_ids': robot_ids,
+            'pins': pins,
+            'text': [entry if isinstance(entry, str) else dict(entry) for entry in plan_text],
+        }, separators=(',', ':')).encode()
+        return b''.join([PLAN_CACHE_MAGIC, _HEADER.pack(PLAN_CACHE_VERSION, len(header), len(steps)), header, *steps])
+
+    @staticmethod
+    def decode(data) -> tuple[list, list]:
+        if bytes(data[:4]) != PLAN_CACHE_MAGIC:
+            raise ValueError("Not a cached plan")
+        version, header_size, count = _HEADER.unpack_from(data, 4)
+        if version != PLAN_CACHE_VERSION:
+            raise ValueError(f"Unsupported plan cache version: {version}")
+        offset = 4 + _HEADER.size
+        header = json.loads(bytes(data[offset:offset + header_size]))
+        offset += header_size
+
+        robot_ids = header['robot_ids']
+        pins = [tuple(pin) for pin in header['pins']]
+        plan = []
+        for i in range(count):
+            robot, pin = _STEP.unpack_from(data, offset + i * _STEP.size)
+            plan.append((robot_ids[robot], pins[pin]))
+        return plan, header['text']
@@ -0,0 +1,74 @@
+import json
+import os
+from bdd_compiler import CompiledBDD, compile_bdd
+from fleet_state import LocationTable
+from heuristics import make_heuristic
+from state_encoding import StateEncoding
+
+DEFAULT_CONFIG_PATH = 'generated_bdd.json'
+
+
+class PlannerConfig:
+    """A parsed mission config (BDD, locations and prop_to_location) with everything that is
+    precomputed from it: the compiled BDD, the location table, the state encoding and the
+    heuristic tables.
+
+    Nothing here changes once it is built, so one PlannerConfig can back any number of
+    SearchTrees in any number of threads. Each tree searches on a fork of the location table
+    and of the heuristic. The encoding does memoize lookups, but a memo entry is the same
+    whichever search writes it first."""
+
+    def __init__(self, bdd_config: dict, reduce_bdd: bool = True, optimize_bdd_order: bool = False, heuristic: str = 'cover'):
+        self.bdd_config = bdd_config
+        self.reduce_bdd = reduce_bdd
+        self.optimize_bdd_order = optimize_bdd_order
+        self.heuristic_name = heuristic
+
+        self.props : set[str] = set()
+        for node in bdd_config['nodes'].values():
+            if 'var' in node:
+                self.props.add(node['var'])
+
+        self.location_to_pin : dict[str, tuple[int, int]] = {}
+        self.pin_to_location : dict[tuple[int, int], str] = {}
+        self.location_to_prop : dict[str, list[str]] = {}
+        for loc, pin in bdd_config['locations'].items():
+            tuple_pin = tuple(pin)
+            self.location_to_pin[loc] = tuple_pin
+            self.location_to_prop[loc] = []
+            self.pin_to_location[tuple_pin] = loc
+
+        self.prop_to_location : dict[str, list[str]] = bdd_config['prop_to_location']
+        for prop, locs in self.prop_to_location.items():
+            for loc in locs:
+                if loc not in self.location_to_prop:
+                    self.location_to_prop[loc] = []
+                self.location_to_prop[loc].append(prop)
+
+        # Pins and the location distance matrix are fixed for every search on this config
+        self.locations = LocationTable(self.location_to_pin)
+        self.encoding = StateEncoding(set(self.props) | set(self.prop_to_location), self.locations.names, self.location_to_prop)
+
+        self.root_node : str = bdd_config['root']
+        self.next_query : dict[str, dict] = bdd_config['nodes']
+        self.bdd : CompiledBDD = compile_bdd(self.next_query, self.root_node, reduce=reduce_bdd, optimize_order=optimize_bdd_order)
+        self.starting_prop : str = self.bdd.var_name(self.bdd.root) or ''
+        # Precomputed per BDD node, shared by every search on this config through fork()
+        self.heuristic = make_heuristic(heuristic, self.bdd, self.encoding, self.locations)
+
+    @classmethod
+    def load(cls, source: dict | str | os.PathLike | None = None, **options) -> 'PlannerConfig':
+        """Config from an in-memory dict or a JSON file, generated_bdd.json in the working
+        directory when `source` is None. `options` are passed to the constructor."""
+        if source is None:
+            source = DEFAULT_CONFIG_PATH
+        if not isinstance(source, dict):
+            with open(source, 'r') as file:
+                source = json.load(file)
+        return cls(source, **options)
+
+    def search_tree(self, **options):
+        """A new SearchTree on this config, one per concurrent search. `options` are the
+        SearchTree options that do not change the config, like plan_cache or top_k."""
+        from create_plan import SearchTree
+        return SearchTree(config=self, **options)
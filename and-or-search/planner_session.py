@@ -0,0 +1,137 @@
+import numpy as np
+from robot_class import RobotMap
+from fleet_state import FleetState, DISTANCE_TOLERANCE
+from time_step_node_class import TimeStepNode, next_node_id
+
+
+class PlannerSession:
+    """Keeps the search graph of a SearchTree between observations.
+
+    plan() searches once. After the robots have carried out the first assignments and a prop
+    was observed, observe() looks for the robot_assignment node of that outcome one decision
+    below the current root. When its robots match the reported ones, the graph is re-rooted
+    there: expansions and costs below it are kept and only an incomplete subtree is searched
+    further. When the robots drifted from the plan or the outcome is not in the graph, the
+    session searches again from the reported state."""
+
+    def __init__(self, search_tree, strategy: str = 'breadth_first', workers: int = 1, split_depth: int = 1, deadline: float | None = None):
+        self.search_tree = search_tree
+        self.strategy = strategy
+        self.search_options = {'workers': workers, 'split_depth': split_depth, 'deadline': deadline}
+        self.root : TimeStepNode | None = None
+        self.reused = False
+
+    def plan(self, robot_map: RobotMap, resolution: dict[str, str]) -> tuple[list, list]:
+        self.root = self.search_tree.search(robot_map, resolution, strategy=self.strategy, **self.search_options)
+        self.reused = False
+        return self.search_tree.best_plan_from(self.root)
+
+    def start_node(self) -> TimeStepNode:
+        return self.root.next[0]
+
+    def outcomes(self) -> list[TimeStepNode]:
+        """robot_assignment nodes one decision below the root."""
+        outcomes = []
+        seen = set()
+        stack = list(self.start_node().next)
+        while stack:
+            node = stack.pop()
+            if node.id in seen:
+                continue
+            seen.add(node.id)
+            if node.type == 'robot_assignment':
+                outcomes.append(node)
+            else:
+                stack.extend(node.next)
+        return outcomes
+
+    @staticmethod
+    def matches(node: TimeStepNode, fleet: FleetState) -> bool:
+        """Same robots at the same positions, within DISTANCE_TOLERANCE, heading to the same targets."""
+        return (node.fleet.ids == fleet.ids
+                and np.array_equal(node.fleet.targets, fleet.targets)
+                and bool(np.all(np.abs(node.fleet.positions - fleet.positions) < DISTANCE_TOLERANCE)))
+
+    def subtree(self, node: TimeStepNode):
+        stack = [node]
+        seen = set()
+        while stack:
+            current = stack.pop()
+            if current.id in seen:
+                continue
+            seen.add(current.id)
+            yield current
+            stack.extend(current.next)
+
+    def unexpanded(self, node: TimeStepNode) -> list[TimeStepNode]:
+        bdd = self.search_tree.robot_manager.bdd
+        return [current for current in self.subtree(node)
+                if current.type == 'robot_assignment' and not current.expanded and not bdd.is_terminal(current.query)]
+
+    def is_complete(self, node: TimeStepNode) -> bool:
+        tree = self.search_tree
+        if self.unexpanded(node):
+            return False
+        return not any(current.id in tree.unsolved or current.id in tree.subplans for current in self.subtree(node))
+
+    def observe(self, robot_map: RobotMap, resolution: dict[str, str], visited_locations: set[str] | None = None) -> tuple[list, list]:
+        """Replans from the reported robots and resolution. Without `visited_locations` any
+        visits of a matching outcome are accepted, and a new search counts the earlier visits
+        plus the locations robots stand on."""
+        tree = self.search_tree
+        robot_manager = tree.robot_manager
+        encoding = robot_manager.encoding
+        fleet = FleetState.from_robot_map(robot_map, robot_manager.locations)
+        known, true = encoding.encode_resolution(resolution)
+        query = robot_manager.next_question(self.start_node().query, (known, true))
+
+        given_mask = encoding.location_mask(visited_locations) if visited_locations is not None else None
+        for node in self.outcomes():
+            relevant = robot_manager.support[node.query]
+            node_known, node_true = node.resolution
+            if (node.query == query and node_known & relevant == known & relevant
+                    and node_true & relevant == true & relevant
+                    and (given_mask is None or node.visited_mask == given_mask)
+                    and self.matches(node, fleet)):
+                return self.reroot(node)
+
+        if given_mask is not None:
+            visited_mask = given_mask
+        else:
+            standing = (robot_manager.locations.distances_from(fleet.positions) < DISTANCE_TOLERANCE).any(axis=0)
+            visited_mask = self.start_node().visited_mask | encoding.location_mask(
+                name for name, stands in zip(encoding.location_names, standing) if stands)
+
+        self.root = tree.search(robot_map, resolution, strategy=self.strategy,
+                                start_query=query, visited_mask=visited_mask, **self.search_options)
+        self.reused = False
+        return tree.best_plan_from(self.root)
+
+    def reroot(self, node: TimeStepNode) -> tuple[list, list]:
+        tree = self.search_tree
+        robot_manager = tree.robot_manager
+        head = TimeStepNode(
+            id = next_node_id(),
+            fleet = node.fleet,
+            query = node.query,
+            next = [node],
+            type = 'query',
+            resolution = node.resolution,
+            visited_mask = node.visited_mask,
+            encoding = node.encoding,
+        )
+        robot_manager.head_time_step_node = head
+        self.root = head
+        self.reused = True
+
+        if not self.is_complete(node):
+            # Bounds and worker results were only valid for the old root, the expansions stay
+            tree.cost_map = {}
+            tree.objective_maps = {}
+            tree.unsolved = set()
+            tree.subplans = {}
+            tree.search_stats = {'expanded': 0}
+            robot_manager.time_step_queue = self.unexpanded(node)
+            tree.run_strategy(robot_manager, self.strategy, **self.search_options)
+        return tree.best_plan_from(head)
+
@@ -0,0 +1,184 @@
+import json
+import struct
+from time_step_node_class import TimeStepNode
+
+POLICY_MAGIC = b'AOPL'
+POLICY_VERSION = 1
+# query, known mask, true mask, visited mask, number of assignments
+_ENTRY = struct.Struct('<IQQQH')
+# robot index, location index
+_ASSIGNMENT = struct.Struct('<HH')
+_MASK_LIMIT = 1 << 64
+
+PolicyKey = tuple[int, int, int, int]
+
+
+class Policy:
+    """Complete contingent plan of a search: the combination to issue at every decision point of
+    the optimal policy, for every outcome.
+
+    Entries are keyed by (BDD node, known props, true props, visited locations). Both prop
+    masks only keep the props the BDD still tests at or below the node, which is all an
+    executor needs to know to find its entry. The BDD tables are part of the policy, so a
+    lookup only needs the observed resolution and the visited locations."""
+
+    def __init__(self, robot_ids, location_names, location_pins, props, root: int, tests: list[int], low: list[int], high: list[int], support: list[int],
+                 entries: dict[PolicyKey, tuple[tuple[int, int], ...]]):
+        self.robot_ids : tuple[str, ...] = tuple(robot_ids)
+        self.location_names : tuple[str, ...] = tuple(location_names)
+        self.location_pins : list[tuple] = [tuple(pin) for pin in location_pins]
+        self.props : tuple[str, ...] = tuple(props)
+        self.root = root
+        self.tests = tests
+        self.low = low
+        self.high = high
+        self.support = support
+        self.entries = entries
+        self.prop_bit = {prop: 1 << i for i, prop in enumerate(self.props)}
+        self.location_bit = {loc: 1 << i for i, loc in enumerate(self.location_names)}
+        # Decision points whose key was already taken by another one, see from_search
+        self.conflicts = 0
+
+    @classmethod
+    def from_search(cls, search_tree, root: TimeStepNode) -> 'Policy':
+        """Collects the best combination of every decision point reachable under the optimal
+        policy below `root`. Needs the search graph itself, so searches whose subtrees were
+        left to worker processes or greedy rollouts cannot be exported."""
+        from create_plan import COST_TOLERANCE
+        robot_manager = search_tree.robot_manager
+        bdd = robot_manager.bdd
+        encoding = robot_manager.encoding
+        fleet = root.fleet
+        policy = cls(
+            robot_ids = fleet.ids,
+            location_names = encoding.location_names,
+            location_pins = [search_tree.location_to_pin[name] for name in encoding.location_names],
+            props = encoding.props,
+            root = bdd.root,
+            tests = robot_manager.query_bits,
+            low = bdd.low,
+            high = bdd.high,
+            support = robot_manager.support,
+            entries = {},
+        )
+
+        stack = [root]
+        seen = set()
+        while stack:
+            node = stack.pop()
+            if node.id in seen:
+                continue
+            seen.add(node.id)
+            if node.id in search_tree.subplans:
+                raise ValueError("The policy below a worker or rollout result is not in the search graph")
+
+            if node.type != 'robot_assignment':
+                stack.extend(next_node for next_node in node.next if next_node.id not in search_tree.unsolved)
+                continue
+            if len(node.next) == 0:
+                continue
+
+            best_cost = search_tree.determine_cost(node)
+            for next_node in node.next:
+                if next_node.id in search_tree.unsolved:
+                    continue
+                if abs(search_tree.child_cost(node, next_node) - best_cost) < COST_TOLERANCE:
+                    break
+            else:
+                raise ValueError("The search did not settle a decision of the optimal policy")
+
+            assignment = tuple(sorted((fleet.index[robot_id], encoding.location_bit[location].bit_length() - 1)
+                                      for robot_id, location in (node.segments[next_node.id].assignment or {}).items()))
+            key = policy.key_from_masks(*node.resolution, node.visited_mask)
+            if key in policy.entries and policy.entries[key] != assignment:
+                policy.conflicts += 1
+            else:
+                policy.entries[key] = assignment
+            stack.append(next_node)
+        return policy
+
+    def __len__(self):
+        return len(self.entries)
+
+    def node(self, known: int, true: int) -> int:
+        """BDD node the resolution leads to from the root."""
+        node = self.root
+        while known & self.tests[node]:
+            node = self.high[node] if true & self.tests[node] else self.low[node]
+        return node
+
+    def key_from_masks(self, known: int, true: int, visited: int) -> PolicyKey:
+        node = self.node(known, true)
+        support = self.support[node]
+        return (node, known & support, true & support, visited)
+
+    def key(self, resolution: dict[str, str], visited_locations) -> PolicyKey:
+        known = true = 0
+        for prop, value in resolution.items():
+            bit = self.prop_bit.get(prop, 0)
+            known |= bit
+            if value == 'T':
+                true |= bit
+        visited = 0
+        for loc in visited_locations:
+            visited |= self.location_bit[loc]
+        return self.key_from_masks(known, true, visited)
+
+    def lookup(self, resolution: dict[str, str], visited_locations) -> list[tuple[str, tuple]] | None:
+        """(robot_id, pin) pairs to issue for the observed state, None when the state is not a
+        decision point of the policy."""
+        assignment = self.entries.get(self.key(resolution, visited_locations))
+        if assignment is None:
+            return None
+        return [(self.robot_ids[robot], self.location_pins[location]) for robot, location in assignment]
+
+    def save(self, path: str):
+        header = json.dumps({
+            'version': POLICY_VERSION,
+            'robot_ids': self.robot_ids,
+            'location_names': self.location_names,
+            'location_pins': self.location_pins,
+            'props': self.props,
+            'root': self.root,
+            'tests': self.tests,
+            'low': self.low,
+            'high': self.high,
+            'support': self.support,
+        }).encode()
+
+        chunks = [POLICY_MAGIC, struct.pack('<II', len(header), len(self.entries)), header]
+        for (node, known, true, visited), assignment in self.entries.items():
+            if max(known, true, visited) >= _MASK_LIMIT:
+                raise ValueError("Policies with more than 64 props or locations cannot be saved")
+            chunks.append(_ENTRY.pack(node, known, true, visited, len(assignment)))
+            chunks.extend(_ASSIGNMENT.pack(robot, location) for robot, location in assignment)
+        with open(path, 'wb') as file:
+            file.write(b''.join(chunks))
+
+    @classmethod
+    def load(cls, path: str) -> 'Policy':
+        with open(path, 'rb') as file:
+            data = file.read()
+        return cls.from_bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data) -> 'Policy':
+        if bytes(data[:4]) != POLICY_MAGIC:
+            raise ValueError("Not a policy file")
+        header_size, count = struct.unpack_from('<II', data, 4)
+        offset = 12
+        header = json.loads(bytes(data[offset:offset + header_size]))
+        if header['version'] != POLICY_VERSION:
+            raise ValueError(f"Unsupported policy version: {header['version']}")
+        offset += header_size
+
+        entries = {}
+        for _ in range(count):
+            node, known, true, visited, size = _ENTRY.unpack_from(data, offset)
+            offset += _ENTRY.size
+            assignment = tuple(_ASSIGNMENT.unpack_from(data, offset + i * _ASSIGNMENT.size) for i in range(size))
+            offset += size * _ASSIGNMENT.size
+            entries[(node, known, true, visited)] = assignment
+
+        return cls(header['robot_ids'], header['location_names'], header['location_pins'], header['props'], header['root'],
+                   header['tests'], header['low'], header['high'], header['support'], entries)
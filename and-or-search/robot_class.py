@@ -1,4 +1,6 @@
 class Robot:
+    __slots__ = ('id', 'position', 'assigned_loc', 'cost', 'time', 'velocity')
+
     def __init__(self, id, position = None, assigned_loc = '', cost = 0.0, time = 0.0):
         if position is None:
             position = [0, 0]
@@ -8,8 +10,7 @@ class Robot:
         self.cost: float = cost
         self.time: float = time
         self.velocity: float = 1.0
-        
-    
+
     def __str__(self):
         return f"Robot(id={self.id}, position=({round(self.position[0], 2)}, {round(self.position[1], 2)}), assigned_loc={self.assigned_loc}, cost={round(self.cost, 2)}, time={round(self.time, 2)})"
     
@@ -1,265 +1,368 @@
 from robot_class import Robot, RobotMap
-from time_step_node_class import TimeStepNode
-import copy
-import uuid
+from time_step_node_class import TimeStepNode, Trajectory, NO_OFFSETS, NO_SEGMENTS, next_node_id
+from fleet_state import FleetState, FleetMotion, LocationTable, DISTANCE_TOLERANCE
+from state_encoding import StateEncoding
+from bdd_compiler import CompiledBDD, compile_bdd
+from assignment import k_best_assignments
+import numpy as np
+from typing import Iterator
 
 def euclidean_distance(pos1, pos2):
     """Calculate the Euclidean distance between two positions."""
     return ((pos1[0] - pos2[0]) ** 2 + (pos1[1] - pos2[1]) ** 2) ** 0.5
 
-def _known_properties(visited_locations, location_to_prop : dict[str, list[str]]) -> set[str]:
-    """Returns the set of properties that are known to be true in the visited locations."""
-    known_props = set()
-    for loc in visited_locations:
-        for prop in location_to_prop[loc]:
-            known_props.add(prop)
-    return known_props
-
-DISTANCE_TOLERANCE = 0.01
+def state_key(type: str, query: int, fleet: FleetState, resolution: tuple[int, int], visited_mask: int) -> tuple:
+    """Canonical hash key of a search state. Positions and times are quantized by
+    DISTANCE_TOLERANCE. Accumulated robot costs are left out on purpose, two states that only
+    differ in cost share the same subtree shifted by a constant."""
+    return (type, query, fleet.key(), resolution, visited_mask)
 
 class RobotManager:
-    next_question_map : dict[str, list[str]] = {}
-    head_time_step_node : TimeStepNode = None
-    initial_question : str = ''
-    time_step_queue : list[TimeStepNode] = []
-    props : set[str] = set()
-    location_to_pin : dict[str, tuple[int, int]] = {}
-    pin_to_location: dict[tuple[int, int], str] = {}
-    location_to_prop : dict[str, list[str]] = {}
-    initial_resolution : dict[str, str] = {}
-
-    def __init__(self, robot_map, next_question_map, initial_question, props, location_to_pin=None, pin_to_location=None, location_to_prop=None, initial_resolution=None):
-        self.next_question_map = next_question_map
-        self.initial_question = initial_question
-        self.props = props
-        self.location_to_pin = location_to_pin
-        self.pin_to_location = pin_to_location
-        self.location_to_prop = location_to_prop
-
-        robot_map_copy = copy.deepcopy(robot_map)
+    """State of one search: the head node, the expansion queue and the transposition table.
+    Everything is set per instance, the config parts are only read."""
+
+    def __init__(self, robot_map, next_question_map, initial_question, props, location_to_pin=None, pin_to_location=None, location_to_prop=None, initial_resolution=None, use_transpositions=True, locations=None, encoding=None, bdd=None, start_query=None, visited_mask=0, horizon=None):
+        self.next_question_map : dict[str, dict] = next_question_map
+        self.initial_question : str = initial_question
+        self.props : set[str] = props
+        self.location_to_pin : dict[str, tuple[int, int]] = location_to_pin
+        self.pin_to_location : dict[tuple[int, int], str] = pin_to_location
+        self.location_to_prop : dict[str, list[str]] = location_to_prop
+        self.initial_resolution : dict[str, str] = dict(initial_resolution or {})
+
+        self.locations = locations if locations is not None else LocationTable(location_to_pin)
+        self.bdd : CompiledBDD = bdd if bdd is not None else compile_bdd(next_question_map, initial_question)
+        if encoding is None:
+            encoding = StateEncoding(set(props) | set(self.bdd.variables) | {prop for loc_props in location_to_prop.values() for prop in loc_props},
+                                     self.locations.names, location_to_prop)
+        self.encoding = encoding
+        # Per BDD node: bit of the tested prop, props tested at or below it, and the locations
+        # that can answer its test
+        self.query_bits = self.bdd.test_masks(encoding.prop_bit)
+        self.support = self.bdd.support_masks(encoding.prop_bit)
+        self.query_locations = [0 if self.bdd.is_terminal(node) else encoding.prop_locations[self.bdd.var_name(node)]
+                                for node in range(len(self.bdd))]
+        fleet = FleetState.from_robot_map(robot_map, self.locations)
+        resolution = encoding.encode_resolution(initial_resolution)
+
+        # The search can also start below the BDD root, from a node of an earlier search
+        query = self.bdd.root if start_query is None else start_query
+        self.start_query = query
+        # Query layers below start_query that get expanded, None for all of them
+        self.horizon = horizon
 
         start_node = TimeStepNode(
-            id = str(uuid.uuid1()),
-            robot_map = robot_map_copy,
-            query = initial_question,
+            id = next_node_id(),
+            fleet = fleet,
+            query = query,
             next = [],
             type = 'robot_assignment',
-            resolved_questions= copy.deepcopy(initial_resolution) if initial_resolution else {},
+            resolution = resolution,
+            visited_mask = visited_mask,
+            encoding = encoding,
         )
-        start_node.visited_locations = set()
-        self.head_time_step_node = TimeStepNode(
-            id = str(uuid.uuid1()),
-            robot_map = robot_map_copy,
-            query = initial_question,
+        self.head_time_step_node : TimeStepNode = TimeStepNode(
+            id = next_node_id(),
+            fleet = fleet,
+            query = query,
             next = [start_node],
             type = 'query',
-            resolved_questions= copy.deepcopy(initial_resolution) if initial_resolution else {},
+            resolution = resolution,
+            visited_mask = visited_mask,
+            encoding = encoding,
         )
-        self.head_time_step_node.visited_locations = set()
-        self.time_step_queue = []
+        self.time_step_queue : list[TimeStepNode] = []
         self.time_step_queue.append(start_node)
 
-    def count_traveling_robots(self, robot_map: RobotMap) -> int:
-        """Counts the number of robots that are currently traveling."""
-        count = 0
-        for robot in robot_map.values():
-            if robot.assigned_loc == '' or robot.assigned_loc is None:
-                continue
-            
-            target_location = self.location_to_pin[robot.assigned_loc]
-
-            if euclidean_distance(robot.position, target_location) > DISTANCE_TOLERANCE:
-                count += 1
-        return count
-
-
-    def possible_resolutions(self, index : int, known_properties : list[str], resolved_questions : dict[str, str]) -> list[dict[str, str]]:
-        resolutions : list[dict[str, str]] = []
-
-        if index < 0 or index >= len(known_properties):
-            resolutions.append(copy.deepcopy(resolved_questions))
-            return resolutions
-        
-        property = known_properties[index]
-        if property in resolved_questions:
-            return self.possible_resolutions(index + 1, known_properties, resolved_questions)
-
-        true_resolution = copy.deepcopy(resolved_questions)
-        true_resolution[property] = 'T'
-        resolutions.extend(self.possible_resolutions(index + 1, known_properties, true_resolution))
-
-        false_resolution = copy.deepcopy(resolved_questions)
-        false_resolution[property] = 'F'
-        resolutions.extend(self.possible_resolutions(index + 1, known_properties, false_resolution))
-
+        self.use_transpositions = use_transpositions
+        self.transposition_table : dict[tuple, TimeStepNode] = {}
+        self.transposition_hits = 0
+        self.lookup_transposition(start_node)
+
+    def lookup_transposition(self, node: TimeStepNode) -> TimeStepNode | None:
+        """Returns the already expanded node equivalent to `node`, or registers `node` as the
+        representative of its state and returns None."""
+        if not self.use_transpositions:
+            return None
+        # Props the BDD no longer tests cannot change the subtree
+        relevant = self.support[node.query]
+        known, true = node.resolution
+        key = state_key(node.type, node.query, node.fleet, (known & relevant, true & relevant), node.visited_mask)
+        existing = self.transposition_table.get(key)
+        if existing is None:
+            self.transposition_table[key] = node
+            return None
+        self.transposition_hits += 1
+        return existing
+
+    def link_child(self, parent: TimeStepNode, child: TimeStepNode, base_cost: float | None = None):
+        """Adds `child` under `parent`. `base_cost` is the cost the parent's branch has accumulated
+        when it reaches a shared child, determine_cost shifts the child's value by the difference."""
+        if any(next_node is child for next_node in parent.next):
+            return
+        parent.next.append(child)
+        if base_cost is not None and base_cost != child.base_cost:
+            if parent.cost_offsets is NO_OFFSETS:
+                parent.cost_offsets = {}
+            parent.cost_offsets[child.id] = base_cost - child.base_cost
+
+    def link_segment(self, parent: TimeStepNode, child: TimeStepNode, segment: Trajectory, base_cost: float | None = None):
+        """Adds `child` under `parent`, reached by the movement `segment`. When two combinations
+        of a robot_assignment node move into the same shared child, the cheaper one is kept."""
+        offset = base_cost - child.base_cost if base_cost is not None else 0.0
+        if any(next_node is child for next_node in parent.next):
+            if offset >= parent.cost_offsets.get(child.id, 0.0):
+                return
+        else:
+            parent.next.append(child)
+        if offset != 0.0 or child.id in parent.cost_offsets:
+            if parent.cost_offsets is NO_OFFSETS:
+                parent.cost_offsets = {}
+            parent.cost_offsets[child.id] = offset
+        if parent.segments is NO_SEGMENTS:
+            parent.segments = {}
+        parent.segments[child.id] = segment
+
+    def possible_resolutions(self, resolution: tuple[int, int], known_props: int, relevant: int = -1) -> list[tuple[int, int]]:
+        """Every truth assignment of the props in `known_props` that `resolution` leaves open,
+        all-true first. Only props in `relevant` are branched on, the others stay unknown: the
+        BDD below never tests them, and their value was never observed."""
+        known, true = resolution
+        unresolved = known_props & ~known
+        branching = unresolved & relevant
+        resolutions : list[tuple[int, int]] = []
+        subset = branching
+        while True:
+            resolutions.append((known | branching, true | subset))
+            if subset == 0:
+                break
+            subset = (subset - 1) & branching
         return resolutions
+
+    def next_question(self, question: int, resolution: tuple[int, int]) -> int:
+        """Follows the BDD from `question` as long as the tested prop is resolved."""
+        known, true = resolution
+        bits, low, high = self.query_bits, self.bdd.low, self.bdd.high
+        # Terminals test no prop, so the walk stops there as well
+        while known & bits[question]:
+            question = high[question] if true & bits[question] else low[question]
+        return question
     
-    def update_time_step(self, current_time_step: TimeStepNode, visited_locations_this_step: set[str]):
-        resolved_questions = copy.deepcopy(current_time_step.resolved_questions)
-        robot_map = copy.deepcopy(current_time_step.robot_map)
-
-        new_visited_locations = copy.deepcopy(current_time_step.visited_locations)
-        new_visited_locations.update(visited_locations_this_step)
-
-        known_properties = _known_properties(new_visited_locations, self.location_to_prop)
-        query = copy.deepcopy(current_time_step.query)
-        possible_resolutions = self.possible_resolutions(0, copy.deepcopy(list(known_properties)), resolved_questions)
-        for resolution in possible_resolutions:
-            next_question = copy.deepcopy(query)
-
-            while True:
-                node_data = self.next_question_map[next_question]
-                if 'var' not in node_data:
-                    break
-                
-                prop = node_data['var']
-                if prop in resolution:
-                    truth = resolution[prop] == 'T'
-                    if truth:
-                        next_question = node_data['high']
-                    else:
-                        next_question = node_data['low']
-                else:
-                    break
+    def layers_below_start(self, node: TimeStepNode) -> int:
+        """BDD tests between start_query and the node's query, following its resolution."""
+        known, true = node.resolution
+        bits, low, high = self.query_bits, self.bdd.low, self.bdd.high
+        question = self.start_query
+        layers = 0
+        while question != node.query and known & bits[question]:
+            question = high[question] if true & bits[question] else low[question]
+            layers += 1
+        return layers
+
+    def beyond_horizon(self, node: TimeStepNode) -> bool:
+        """Whether `node` is a robot_assignment node on the frontier of a receding-horizon
+        search, it stays unexpanded and is valued with the heuristic cost-to-go."""
+        return (self.horizon is not None
+                and node.type == 'robot_assignment'
+                and not self.bdd.is_terminal(node.query)
+                and self.layers_below_start(node) >= self.horizon)
+
+    def update_time_step(self, current_time_step: TimeStepNode, arrived_mask: int):
+        """Adds one robot_assignment child per outcome class of the props revealed by this step.
+
+        Outcomes that lead to the same BDD node and agree on every prop still tested below it
+        have the same subtree, so only the first of them gets a child."""
+        # Snapshot of the chain's robot map, shared by every outcome. Robots are never
+        # mutated in place, so a shallow copy is enough.
+        fleet = current_time_step.fleet.copy()
+
+        new_visited_mask = current_time_step.visited_mask | arrived_mask
+        known_props = self.encoding.known_props(new_visited_mask)
+        query = current_time_step.query
+        outcome_classes = set()
+        for resolution in self.possible_resolutions(current_time_step.resolution, known_props, self.support[query]):
+            next_question = self.next_question(query, resolution)
+            if next_question == query:
+                continue
 
-            if next_question == current_time_step.query:
+            relevant = self.support[next_question]
+            outcome = (next_question, resolution[0] & relevant, resolution[1] & relevant)
+            if outcome in outcome_classes:
                 continue
+            outcome_classes.add(outcome)
 
             next_time_step = TimeStepNode(
-                id = str(uuid.uuid1()),
-                robot_map = copy.deepcopy(robot_map),
+                id = next_node_id(),
+                fleet = fleet,
                 query = next_question,
                 next = [],
                 type = 'robot_assignment',
-                resolved_questions= copy.deepcopy(resolution),
+                resolution = resolution,
+                visited_mask = new_visited_mask,
+                encoding = self.encoding,
             )
-            next_time_step.visited_locations = copy.deepcopy(new_visited_locations)
+
+            existing = self.lookup_transposition(next_time_step)
+            if existing is not None:
+                self.link_child(current_time_step, existing, next_time_step.base_cost)
+                continue
             current_time_step.next.append(next_time_step)
 
             # Check if next_question is a valid property node (not a leaf)
-            if 'var' in self.next_question_map[next_question]:
+            if not self.bdd.is_terminal(next_question) and not self.beyond_horizon(next_time_step):
                 self.time_step_queue.append(next_time_step)
 
-    def update_robot_positions(self, robot_map: RobotMap):
-        minimal_arrival_time = float('inf')
-        robots_that_arrived : list[Robot] = []
-        
-        
-        for robot in robot_map.values():
-            arrival_time = robot.time
-            location_pin = robot.position
-            if robot.assigned_loc in self.location_to_pin:
-                location_pin = self.location_to_pin[robot.assigned_loc]
-
-            dist = euclidean_distance(location_pin, robot.position)
-
-            if dist < DISTANCE_TOLERANCE:
-                robots_that_arrived.append(robot)
-                continue
-            elif arrival_time + dist / robot.velocity < minimal_arrival_time:
-                arrival_time = robot.time + dist / robot.velocity
-                minimal_arrival_time = arrival_time
-        
-        def move_robot_towards_location(robot: Robot, target_location: tuple[int, int], time_diff: float):
-            distance = euclidean_distance(robot.position, target_location)
-            distance_traveled = robot.velocity * time_diff
-            if (distance < distance_traveled) or (abs(distance - distance_traveled) < DISTANCE_TOLERANCE):
-                # Robot is already at the target location or can reach it
-                robot.position = (target_location[0], target_location[1])
-                robot.cost += distance
-            else :             
-
-                direction = [
-                    target_location[0] - robot.position[0],
-                    target_location[1] - robot.position[1]
-                ]
-                
-                direction_magnitude = (direction[0] ** 2 + direction[1] ** 2) ** 0.5
-                normalized_direction = [
-                    direction[0] / direction_magnitude,
-                    direction[1] / direction_magnitude
-                ]
-                new_position = (
-                    robot.position[0] + normalized_direction[0] * time_diff * robot.velocity,
-                    robot.position[1] + normalized_direction[1] * time_diff * robot.velocity
-                )
-
-                robot.position = new_position
-                robot.cost += distance_traveled
-        
-
-        for robot in robot_map.values():
-            time_diff = minimal_arrival_time - robot.time
-            robot.time = minimal_arrival_time
-
-            if robot.assigned_loc != '':
-                target_location = self.location_to_pin[robot.assigned_loc]
-                if target_location == None:
-                    target_location = robot.position
-                move_robot_towards_location(robot, target_location, time_diff)
-
-        return robots_that_arrived
-
-    def assign_robot_to_location(self, robot_id: str, location: str, robot_map: RobotMap):
-        robot = robot_map[robot_id]
-        robot.assigned_loc = location
-
-    def generate_combinations(self, property: str, robot_map: RobotMap, visited_locations: set[str]) -> list[dict[str, str]]:
-        locations = list(self.location_to_pin.keys())
-        robot_ids = list(robot_map.keys())
-        combinations : list[dict [str, str]] = []
-        
-        node_data = self.next_question_map[property]
-        if 'var' not in node_data:
+    def start_motion(self, fleet: FleetState) -> FleetMotion:
+        """Arrival events of `fleet` after its robots were given their targets."""
+        return FleetMotion(fleet)
+
+    def greedy_combination(self, property: int, fleet: FleetState, visited_mask: int) -> list[dict[str, str]]:
+        """The single combination that sends the robot closest to a location answering
+        `property` there, or nothing when no location can answer it anymore."""
+        encoding = self.encoding
+        allowed = (self.query_locations[property]
+                   & ~visited_mask
+                   & encoding.informative_locations(encoding.known_props(visited_mask)))
+        if allowed == 0 or len(fleet) == 0:
+            return []
+
+        columns = list(encoding.bits(allowed))
+        # A robot already standing on a location never arrives there, the movement chain of
+        # such a combination has no child, so the next closest pair is taken
+        distances = self.locations.distances_from(fleet.positions)[:, columns]
+        distances = np.where(distances < DISTANCE_TOLERANCE, np.inf, distances)
+        if not np.isfinite(distances).any():
+            return []
+        robot, column = np.unravel_index(np.argmin(distances), distances.shape)
+        location = columns[column]
+        # A robot already heading there is left alone
+        if fleet.targets[robot] == location:
+            return [{}]
+        return [{fleet.ids[robot]: encoding.location_names[location]}]
+
+    def cost_to_go(self, property: int, fleet: FleetState, visited_mask: int, columns: list[int]) -> np.ndarray:
+        """Estimated travel left after observing at each location in `columns`: for the worse
+        child of `property`, the distance from the closest robot, or the observing location,
+        to a location that can answer the child's test."""
+        encoding = self.encoding
+        estimates = np.zeros(len(columns))
+        robot_reach = self.locations.distances_from(fleet.positions).min(axis=0)
+        for index, column in enumerate(columns):
+            visited = visited_mask | 1 << column
+            free = encoding.informative_locations(encoding.known_props(visited)) & ~visited
+            for child in (self.bdd.low[property], self.bdd.high[property]):
+                child_columns = list(encoding.bits(self.query_locations[child] & free))
+                if child_columns:
+                    reach = min(robot_reach[child_columns].min(), self.locations.distances[column, child_columns].min())
+                    estimates[index] = max(estimates[index], reach)
+        return estimates
+
+    def matched_combinations(self, property: int, fleet: FleetState, visited_mask: int, top_k: int) -> list[dict[str, str]]:
+        """The `top_k` best combinations of a min-cost matching, instead of all of them.
+
+        Robots are matched to one observation slot, to the other locations that still reveal
+        an unknown prop, or to staying as they are. A robot fills the slot at the location of
+        `property` with the least travel plus cost_to_go, a large bonus makes sure the slot is
+        always filled, and other locations cost their travel. The k best matchings come from
+        assignment.k_best_assignments."""
+        encoding = self.encoding
+        free = encoding.informative_locations(encoding.known_props(visited_mask)) & ~visited_mask
+        property_columns = list(encoding.bits(self.query_locations[property] & free))
+        if not property_columns or len(fleet) == 0:
+            return []
+
+        robots = len(fleet)
+        targets = fleet.targets.tolist()
+        other_columns = list(encoding.bits(free & ~self.query_locations[property]))
+        # A robot already standing on a location never arrives there, the movement chain of
+        # such a combination has no child
+        distances = self.locations.distances_from(fleet.positions)
+        distances = np.where(distances < DISTANCE_TOLERANCE, np.inf, distances)
+        slot_costs = distances[:, property_columns] + self.cost_to_go(property, fleet, visited_mask, property_columns)
+        slot_choice = np.argmin(slot_costs, axis=1)
+
+        # Columns: the observation slot, the other locations, then one stay column per robot
+        cost = np.full((robots, 1 + len(other_columns) + robots), np.inf)
+        if not np.isfinite(slot_costs).any():
             return []
-        actual_property = node_data['var']
-
-        property_locations = []
-        for loc in locations:
-            if actual_property in self.location_to_prop[loc]:
-                property_locations.append(loc)
-
-        if len(property_locations) == 0:
-            return combinations
-            
-        
-        def generate_assignments(robot_index: int, current_assignment: dict[str, str], used_locations: set[str] = set()):
+        bonus = float(slot_costs[np.isfinite(slot_costs)].sum()) + float(distances[np.isfinite(distances)].sum()) + 1.0
+        cost[:, 0] = slot_costs[np.arange(robots), slot_choice] - bonus
+        cost[:, 1:1 + len(other_columns)] = distances[:, other_columns]
+        for robot, target in enumerate(targets):
+            # Re-sending a robot to its target is the same as leaving it alone
+            if target in other_columns:
+                cost[robot, 1 + other_columns.index(target)] = np.inf
+            cost[robot, 1 + len(other_columns) + robot] = 0.0
+
+        combinations = []
+        seen = set()
+        for _, assignment in k_best_assignments(cost, top_k):
+            if assignment.count(0) == 0:
+                break
+            combination = {}
+            for robot, column in enumerate(assignment):
+                if column == 0:
+                    location = property_columns[slot_choice[robot]]
+                elif column <= len(other_columns):
+                    location = other_columns[column - 1]
+                else:
+                    continue
+                if location != targets[robot]:
+                    combination[fleet.ids[robot]] = encoding.location_names[location]
+            key = tuple(sorted(combination.items()))
+            if key not in seen:
+                seen.add(key)
+                combinations.append(combination)
+        return combinations
+
+    def generate_combinations(self, property: int, fleet: FleetState, visited_mask: int) -> Iterator[dict[str, str]]:
+        """Lazily yields the robot -> location combinations of a robot_assignment node.
+
+        Every robot is either left alone or sent to an unused location that still reveals an
+        unknown prop, and at least one robot has to end up heading to a location of the queried
+        prop. Branches that can no longer reach such a location are cut. Interchangeable robots
+        (same position, time, velocity and target) only take locations in increasing order, and
+        sending a robot to the target it already heads to is left out, it is the same as
+        leaving the robot alone."""
+        encoding = self.encoding
+        property_locations = self.query_locations[property]
+        if property_locations == 0 or len(fleet) == 0:
+            return
+
+        robot_ids = fleet.ids
+        targets = fleet.targets.tolist()
+        twins = fleet.twins()
+        current_assignment : dict[str, str] = {}
+        choices = [-1] * len(robot_ids)
+
+        def generate_assignments(robot_index: int, used_locations: int, covered: int):
             if robot_index == len(robot_ids):
-                # Check if at least one robot is assigned to a the property location
-                values = current_assignment.values()
-                flag = False
-                for loc in values:
-                    if loc in property_locations:
-                        flag = True
-                        break
-                    
-                if flag:
-                    combinations.append(copy.deepcopy(current_assignment))
+                if covered & property_locations:
+                    yield dict(current_assignment)
+                return
 
+            free = encoding.informative_locations(encoding.known_props(used_locations)) & ~used_locations
+            # Free locations only shrink further down, and a robot left alone only covers a free one
+            if not (covered | free) & property_locations:
                 return
-                        
 
             robot_id = robot_ids[robot_index]
-            known_props = _known_properties(used_locations, self.location_to_prop)
-            generate_assignments(robot_index + 1, current_assignment, used_locations)  # Skip this robot
-
-            for location in locations:
-                props = self.location_to_prop[location]
-                skip = True
-                for prop in props:
-                    if prop not in known_props:
-                        skip = False
-                        break
-
-               
-                
-                if (location not in used_locations) and (not skip):
-                    new_assignment = copy.deepcopy(current_assignment)
-                    new_used_locations = copy.deepcopy(used_locations)
-                    new_assignment[robot_id] = location
-                    new_used_locations.add(location)
-                    generate_assignments(robot_index + 1, new_assignment, new_used_locations)
-
-        generate_assignments(0, {}, set(visited_locations))
-        return combinations
-
+            target = targets[robot_index]
+            twin = twins[robot_index]
+            floor = choices[twin] if twin >= 0 else -1
+
+            if floor < 0:
+                # Skip this robot, its target counts where re-sending it there would have
+                choices[robot_index] = -1
+                heading_target = 1 << target if target >= 0 else 0
+                yield from generate_assignments(robot_index + 1, used_locations, covered | (heading_target & free))
+
+            for i in encoding.bits(free):
+                if i <= floor or i == target:
+                    continue
+                choices[robot_index] = i
+                current_assignment[robot_id] = encoding.location_names[i]
+                yield from generate_assignments(robot_index + 1, used_locations | 1 << i, covered | 1 << i)
+                del current_assignment[robot_id]
+
+        yield from generate_assignments(0, visited_mask, 0)
@@ -0,0 +1,84 @@
+from time_step_node_class import FrozenResolution
+
+class StateEncoding:
+    """Bit positions of the props and locations of a config.
+
+    Visited locations are a location mask and a resolution is a (known, true) pair of prop
+    masks, so nodes hold a few ints instead of sets and dicts, the props a set of visits
+    reveals is an OR over `location_props`, and state keys hash in constant time. Location
+    bits follow LocationTable order, so a FleetState target index is also its bit."""
+
+    def __init__(self, props, location_names, location_to_prop: dict[str, list[str]]):
+        self.props : tuple[str, ...] = tuple(sorted(props))
+        self.prop_bit : dict[str, int] = {prop: 1 << i for i, prop in enumerate(self.props)}
+        self.location_names : tuple[str, ...] = tuple(location_names)
+        self.location_bit : dict[str, int] = {loc: 1 << i for i, loc in enumerate(self.location_names)}
+
+        self.location_props : list[int] = []
+        for loc in self.location_names:
+            mask = 0
+            for prop in location_to_prop.get(loc, []):
+                mask |= self.prop_bit[prop]
+            self.location_props.append(mask)
+
+        # Locations holding each prop, as a location mask
+        self.prop_locations : dict[str, int] = {prop: 0 for prop in self.props}
+        for i, mask in enumerate(self.location_props):
+            for prop in self.props:
+                if mask & self.prop_bit[prop]:
+                    self.prop_locations[prop] |= 1 << i
+
+        self._known_props : dict[int, int] = {0: 0}
+        self._informative : dict[int, int] = {}
+
+    @staticmethod
+    def bits(mask: int):
+        """Indices of the set bits, lowest first."""
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def location_mask(self, locations) -> int:
+        mask = 0
+        for loc in locations:
+            mask |= self.location_bit[loc]
+        return mask
+
+    def locations(self, mask: int) -> frozenset[str]:
+        return frozenset(self.location_names[i] for i in self.bits(mask))
+
+    def known_props(self, visited_mask: int) -> int:
+        """Mask of the props revealed by the visited locations."""
+        known = self._known_props.get(visited_mask)
+        if known is None:
+            known = 0
+            for i in self.bits(visited_mask):
+                known |= self.location_props[i]
+            self._known_props[visited_mask] = known
+        return known
+
+    def informative_locations(self, known_mask: int) -> int:
+        """Mask of the locations that still hold a prop outside `known_mask`."""
+        mask = self._informative.get(known_mask)
+        if mask is None:
+            mask = 0
+            for i, props in enumerate(self.location_props):
+                if props & ~known_mask:
+                    mask |= 1 << i
+            self._informative[known_mask] = mask
+        return mask
+
+    def encode_resolution(self, resolution: dict[str, str] | None) -> tuple[int, int]:
+        known = true = 0
+        for prop, value in (resolution or {}).items():
+            if prop not in self.prop_bit:
+                raise ValueError(f"Unknown property in resolution: {prop}")
+            known |= self.prop_bit[prop]
+            if value == 'T':
+                true |= self.prop_bit[prop]
+        return (known, true)
+
+    def decode_resolution(self, resolution: tuple[int, int]) -> FrozenResolution:
+        known, true = resolution
+        return FrozenResolution({self.props[i]: 'T' if true >> i & 1 else 'F' for i in self.bits(known)})
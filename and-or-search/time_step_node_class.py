@@ -1,33 +1,89 @@
+import itertools
+import types
 from robot_class import Robot, RobotMap
+from fleet_state import FleetState
+
+_node_ids = itertools.count()
+# Shared cost_offsets of nodes without shifted children, link_child gives a node its own dict
+NO_OFFSETS = types.MappingProxyType({})
+# Shared segments of nodes whose children are not reached by moving
+NO_SEGMENTS = types.MappingProxyType({})
+
+def next_node_id() -> int:
+    """Dense node ids, unique within the process, also across threads."""
+    return next(_node_ids)
+
+class FrozenResolution(dict):
+    """Read-only prop -> 'T'/'F' mapping. Nodes share one instance instead of copying it."""
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('FrozenResolution is read-only')
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __hash__(self):
+        return hash(frozenset(self.items()))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
 class TimeStepNode: 
+    __slots__ = ('_id', '_fleet', '_query', '_type', 'resolution', 'visited_mask', 'encoding', 'next',
+                 'base_cost', 'cost_offsets', 'expanded', 'segments')
+
     @property
-    def id(self) -> str:
+    def id(self) -> int:
         return self._id
     @property
+    def fleet(self) -> FleetState:
+        return self._fleet
+
+    @property
     def robot_map(self) -> RobotMap:
-        return self._robot_map
+        return self._fleet.robot_map()
     
     @property
-    def query(self) -> str:
+    def query(self) -> int:
         return self._query
     
     @property 
     def type(self) -> str:
         return self._type
 
+    @property
+    def resolved_questions(self) -> FrozenResolution:
+        return self.encoding.decode_resolution(self.resolution)
+
+    @property
+    def visited_locations(self) -> frozenset[str]:
+        return self.encoding.locations(self.visited_mask)
+
 
 
     
 
-    def __init__(self, id: str, robot_map: RobotMap, query: str, type: str, resolved_questions: dict[str, str], next: list['TimeStepNode'], visited_locations: set[str] | None = None):
+    def __init__(self, id: int, fleet: FleetState, query: int, type: str, resolution: tuple[int, int], next: list['TimeStepNode'], visited_mask: int = 0, encoding=None):
         self._id = id
-        self._robot_map = robot_map
+        self._fleet = fleet
         self._query = query
         self._type = type
-        self.resolved_questions = resolved_questions
+        # (known, true) prop masks and visited location mask, see StateEncoding
+        self.resolution = resolution
+        self.visited_mask = visited_mask
+        self.encoding = encoding
         self.next = next if next is not None else []
-        self.visited_locations = visited_locations if visited_locations is not None else set()
+        # Cost when the node was created. The robot map of nodes along a movement chain keeps
+        # changing afterwards, so transposition offsets are measured against this value.
+        self.base_cost = self.get_cost()
+        # Cost shift per child id for children reached through the transposition table
+        self.cost_offsets : dict[int, float] = NO_OFFSETS
+        self.expanded = False
+        # Movement to each child that is reached by moving the robots to their next arrival
+        self.segments : dict[int, Trajectory] = NO_SEGMENTS
 
     def __eq__(self, other: 'TimeStepNode') -> bool:
         if not isinstance(other, TimeStepNode):
@@ -40,17 +96,17 @@ class TimeStepNode:
                 self.next == other.next and
                 self.visitedLocations == other.visitedLocations)
     
+    def materialized_next(self) -> list['TimeStepNode']:
+        """Children with a robot_moving node in front of every child reached by moving, the
+        way the graph used to be stored. Meant for debugging and visualization."""
+        return [self.segments[next_node.id].moving_node(self, next_node) if next_node.id in self.segments else next_node
+                for next_node in self.next]
+
     def get_cost(self) -> float:
-        total_cost = 0.0
-        for robot in self.robot_map.values():
-            total_cost += robot.cost
-        return total_cost
+        return self._fleet.total_cost()
 
     def get_time(self) -> float:
-        max_time = 0.0
-        for robot in self.robot_map.values():
-            max_time = max(max_time, robot.time)
-        return max_time
+        return max(0.0, self._fleet.max_time())
     
     def __str__(self):
         s = f"TimeStepNode(query={self.query}, type={self.type}, resolved_questions={self.resolved_questions}, robot_map={self.robot_map}, visited_locations={self.visited_locations})"
@@ -60,4 +116,47 @@ class TimeStepNode:
         return s
     
     def __repr__(self):
-        return self.__str__()
\ No newline at end of file
+        return self.__str__()
+
+
+class Trajectory:
+    """Movement of the robots from one node to the next arrival, stored on the edge instead of
+    as a robot_moving node.
+
+    `moves` holds (robot index, target location index, departure time, cost increment) for
+    every robot that moved, all of them until `arrival`. `fleet` is the state container of
+    the movement chain and `assignment` the combination that started it, for the first
+    segment of a chain."""
+    __slots__ = ('fleet', 'arrival', 'moves', 'assignment')
+
+    def __init__(self, fleet: FleetState, arrival: float, moves: tuple[tuple[int, int, float, float], ...], assignment: dict[str, str] | None = None):
+        self.fleet = fleet
+        self.arrival = arrival
+        self.moves = moves
+        self.assignment = assignment
+
+    @classmethod
+    def between(cls, fleet: FleetState, targets, times, costs, assignment: dict[str, str] | None = None) -> 'Trajectory':
+        """Segment from the `targets`, `times` and `costs` arrays a fleet had before an
+        arrival to its state after it."""
+        increments = fleet.costs - costs
+        moves = tuple((robot, target, departure, increment)
+                      for robot, (target, departure, increment) in enumerate(zip(targets.tolist(), times.tolist(), increments.tolist()))
+                      if target >= 0)
+        return cls(fleet, float(fleet.times[0]) if len(fleet) else 0.0, moves, assignment)
+
+    def moving_node(self, parent: TimeStepNode, child: TimeStepNode) -> TimeStepNode:
+        """robot_moving node between `parent` and `child`."""
+        node = TimeStepNode(
+            id = next_node_id(),
+            fleet = self.fleet,
+            query = parent.query,
+            type = 'robot_moving',
+            resolution = parent.resolution,
+            next = [child],
+            visited_mask = parent.visited_mask,
+            encoding = parent.encoding,
+        )
+        if child.id in parent.cost_offsets:
+            node.cost_offsets = {child.id: parent.cost_offsets[child.id]}
+        return node
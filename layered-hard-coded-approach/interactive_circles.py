@@ -1,45 +1,27 @@
 import matplotlib.pyplot as plt
 import numpy as np
+from support_placement import sample_disk, minimax_scores, minimax_point
+
+MAX_PLOTTED_CANDIDATES = 5000
 
 def distance(p1, p2):
     return np.sqrt((p1[0] - p2[0])**2 + (p1[1] - p2[1])**2)
 
-def solve_step(mover_pos, support_pos, target_pos, next_targets, ax, title, labels):
+def solve_step(mover_pos, support_pos, target_pos, next_targets, ax, title, labels, num_samples=2000, exact=True):
     # Calculate max travel distance (distance mover travels to target)
     max_travel_dist = distance(mover_pos, target_pos)
     
-    # Generate random candidates for support robot
-    num_samples = 2000
-    candidates = []
-    # Always include staying put
-    candidates.append(support_pos)
-    
-    while len(candidates) < num_samples:
-        angle = np.random.uniform(0, 2 * np.pi)
-        r = np.sqrt(np.random.uniform(0, 1)) * max_travel_dist
-        dx = r * np.cos(angle)
-        dy = r * np.sin(angle)
-        cand = support_pos + np.array([dx, dy])
-        candidates.append(cand)
-    
-    candidates = np.array(candidates)
+    # Random candidates for the support robot, the first one is staying put
+    candidates = sample_disk(support_pos, max_travel_dist, num_samples)
     
     # Evaluate candidates
     # Metric: Minimize Max(MinDist(NextTarget1), MinDist(NextTarget2))
-    scores = []
-    for cand in candidates:
-        target_scores = []
-        for nt in next_targets:
-            d1 = distance(target_pos, nt)
-            d2 = distance(cand, nt)
-            target_scores.append(min(d1, d2))
-        
-        # Minimax
-        scores.append(max(target_scores))
-        
-    scores = np.array(scores)
-    best_idx = np.argmin(scores)
-    best_candidate = candidates[best_idx]
+    scores = minimax_scores(candidates, target_pos, next_targets)
+    if exact:
+        best_candidate, _ = minimax_point(support_pos, max_travel_dist, target_pos, next_targets)
+    else:
+        best_idx = np.argmin(scores)
+        best_candidate = candidates[best_idx]
     
     # Visualization
     ax.axis('equal')
@@ -73,8 +55,9 @@ def solve_step(mover_pos, support_pos, target_pos, next_targets, ax, title, labe
     cy = support_pos[1] + max_travel_dist * np.sin(theta)
     ax.plot(cx, cy, 'b--', alpha=0.3)
     
-    # Plot Heatmap
-    sc = ax.scatter(candidates[:, 0], candidates[:, 1], c=scores, cmap='viridis_r', s=20, alpha=0.6, edgecolors='none')
+    # Plot Heatmap, a subset is enough to show the score landscape
+    shown = slice(0, MAX_PLOTTED_CANDIDATES)
+    sc = ax.scatter(candidates[shown, 0], candidates[shown, 1], c=scores[shown], cmap='viridis_r', s=20, alpha=0.6, edgecolors='none')
     plt.colorbar(sc, ax=ax, label='Max MinDist to Next Targets')
     
     # Plot Best Candidate
@@ -0,0 +1,87 @@
+import itertools
+import numpy as np
+
+def sample_disk(center, radius, num_samples):
+    """`num_samples` points uniformly distributed in the disk, the first one is the center itself."""
+    center = np.asarray(center, dtype=float)
+    count = max(num_samples - 1, 0)
+    angles = np.random.uniform(0, 2 * np.pi, count)
+    radii = np.sqrt(np.random.uniform(0, 1, count)) * radius
+    offsets = np.stack([radii * np.cos(angles), radii * np.sin(angles)], axis=1)
+    return np.vstack([center[None, :], center + offsets])
+
+def minimax_scores(candidates, target_pos, next_targets):
+    """For every candidate: the max over the next targets of the distance from the closer of
+    the mover (at `target_pos`) and the candidate. `target_pos` can also hold one row per
+    robot, then the closest of them covers each target."""
+    candidates = np.asarray(candidates, dtype=float).reshape(-1, 2)
+    next_targets = np.asarray(next_targets, dtype=float).reshape(-1, 2)
+    if len(next_targets) == 0:
+        return np.zeros(len(candidates))
+    covering = np.asarray(target_pos, dtype=float).reshape(-1, 2)
+    mover_offsets = next_targets[:, None, :] - covering[None, :, :]
+    mover_dists = np.hypot(mover_offsets[..., 0], mover_offsets[..., 1]).min(axis=1)
+    offsets = candidates[:, None, :] - next_targets[None, :, :]
+    support_dists = np.hypot(offsets[..., 0], offsets[..., 1])
+    return np.minimum(support_dists, mover_dists[None, :]).max(axis=1)
+
+def _circle_bisector_points(center, radius, p, q):
+    """Points of the circle that are as far from p as from q."""
+    direction = q - p
+    length = np.linalg.norm(direction)
+    if length == 0:
+        return []
+    normal = direction / length
+    # Bisector: normal . x = offset
+    offset = normal @ (p + q) / 2
+    distance = offset - normal @ center
+    if abs(distance) > radius:
+        return []
+    foot = center + normal * distance
+    half_chord = np.sqrt(max(radius ** 2 - distance ** 2, 0.0))
+    tangent = np.array([-normal[1], normal[0]])
+    return [foot + tangent * half_chord, foot - tangent * half_chord]
+
+def _circumcenter(a, b, c):
+    d = 2 * (a[0] * (b[1] - c[1]) + b[0] * (c[1] - a[1]) + c[0] * (a[1] - b[1]))
+    if abs(d) < 1e-12:
+        return None
+    a2, b2, c2 = a @ a, b @ b, c @ c
+    return np.array([
+        (a2 * (b[1] - c[1]) + b2 * (c[1] - a[1]) + c2 * (a[1] - b[1])) / d,
+        (a2 * (c[0] - b[0]) + b2 * (a[0] - c[0]) + c2 * (b[0] - a[0])) / d,
+    ])
+
+def minimax_point(support_pos, radius, target_pos, next_targets):
+    """Exact best support position in the disk of `radius` around `support_pos`.
+
+    Once the optimal score t is known, the targets the mover covers within t no longer
+    matter and the rest must be within t of the support robot, so the optimum also solves
+    the smallest enclosing circle problem over those targets, restricted to the disk. Its
+    solution is fixed by at most three targets: inside the disk it is a target, the middle
+    of two targets or the circumcenter of three, on the boundary it is the boundary point
+    closest to one target or equidistant from two. Every such point is a candidate and the
+    best one is exact."""
+    center = np.asarray(support_pos, dtype=float)
+    targets = np.asarray(next_targets, dtype=float).reshape(-1, 2)
+
+    def clamp(point):
+        offset = point - center
+        length = np.linalg.norm(offset)
+        return point if length <= radius else center + offset / length * radius
+
+    candidates = [center]
+    for point in targets:
+        candidates.append(clamp(point))
+    for p, q in itertools.combinations(targets, 2):
+        candidates.append(clamp((p + q) / 2))
+        candidates.extend(_circle_bisector_points(center, radius, p, q))
+    for a, b, c in itertools.combinations(targets, 3):
+        point = _circumcenter(a, b, c)
+        if point is not None:
+            candidates.append(clamp(point))
+
+    candidates = np.array(candidates)
+    scores = minimax_scores(candidates, target_pos, targets)
+    best = int(np.argmin(scores))
+    return candidates[best], float(scores[best])